@@ -1,76 +1,29 @@
-import pandas as pd
-import numpy as np
-
-# Placeholder emission factors (kg CO₂ per kWh)
-emission_factor_norway = 0.012  # CoM emission factor Norway (2021)
-emission_factor_italy = 0.284   # CoM emission factor Italy (2021)
-
-# Function to calculate CO₂ emissions
-def calculate_co2_emissions(ed, emission_factor):
-    return ed * emission_factor
-
-# Example data for energy demand (ED) in kWh from the program calculations
-ed_results = {
-    "Scenario": ["Good", "Average", "Bad"],
-    "ED_1y_R": [14533, 9627, 4048],
-    "ED_1y_T": [2470, 1018, 125],
-    "ED_5y_R": [88726, 58644, 23772],
-    "ED_5y_T": [12264, 4786, 557],
-    "ED_50y_R": [777560, 528332, 223831],
-    "ED_50y_T": [136836, 61510, 10212]
-}
-
-# Calculate CO₂ emissions for each ED result using separate factors for Norway and Italy
-co2_results = {
-    "CO₂_1y_R": [calculate_co2_emissions(ed, emission_factor_italy) for ed in ed_results["ED_1y_R"]],
-    "CO₂_1y_T": [calculate_co2_emissions(ed, emission_factor_norway) for ed in ed_results["ED_1y_T"]],
-    "CO₂_5y_R": [calculate_co2_emissions(ed, emission_factor_italy) for ed in ed_results["ED_5y_R"]],
-    "CO₂_5y_T": [calculate_co2_emissions(ed, emission_factor_norway) for ed in ed_results["ED_5y_T"]],
-    "CO₂_50y_R": [calculate_co2_emissions(ed, emission_factor_italy) for ed in ed_results["ED_50y_R"]],
-    "CO₂_50y_T": [calculate_co2_emissions(ed, emission_factor_norway) for ed in ed_results["ED_50y_T"]]
-}
-
-# Print the results in the desired format
-print("Total Energy Demand (Thermal + Humidity) and CO₂ Emissions:")
-
-# Scenarios for 1 Year
-print("\nTotal Energy Demand (Thermal + Humidity) for 1 Year (Good Scenario):")
-print(f"Norway: {ed_results['ED_1y_T'][0]:.2f} kWh, Italy: {ed_results['ED_1y_R'][0]:.2f} kWh")
-print(f"CO₂ Emissions for 1 Year (Good Scenario): Norway: {co2_results['CO₂_1y_T'][0]:.2f} kg CO2, Italy: {co2_results['CO₂_1y_R'][0]:.2f} kg CO2")
-
-print("\nTotal Energy Demand (Thermal + Humidity) for 1 Year (Average Scenario):")
-print(f"Norway: {ed_results['ED_1y_T'][1]:.2f} kWh, Italy: {ed_results['ED_1y_R'][1]:.2f} kWh")
-print(f"CO₂ Emissions for 1 Year (Average Scenario): Norway: {co2_results['CO₂_1y_T'][1]:.2f} kg CO2, Italy: {co2_results['CO₂_1y_R'][1]:.2f} kg CO2")
-
-print("\nTotal Energy Demand (Thermal + Humidity) for 1 Year (Bad Scenario):")
-print(f"Norway: {ed_results['ED_1y_T'][2]:.2f} kWh, Italy: {ed_results['ED_1y_R'][2]:.2f} kWh")
-print(f"CO₂ Emissions for 1 Year (Bad Scenario): Norway: {co2_results['CO₂_1y_T'][2]:.2f} kg CO2, Italy: {co2_results['CO₂_1y_R'][2]:.2f} kg CO2")
-
-# Scenarios for 5 Years
-print("\nTotal Energy Demand (Thermal + Humidity) for 5 Years (Good Scenario):")
-print(f"Norway: {ed_results['ED_5y_T'][0]:.2f} kWh, Italy: {ed_results['ED_5y_R'][0]:.2f} kWh")
-print(f"CO₂ Emissions for 5 Years (Good Scenario): Norway: {co2_results['CO₂_5y_T'][0]:.2f} kg CO2, Italy: {co2_results['CO₂_5y_R'][0]:.2f} kg CO2")
-
-print("\nTotal Energy Demand (Thermal + Humidity) for 5 Years (Average Scenario):")
-print(f"Norway: {ed_results['ED_5y_T'][1]:.2f} kWh, Italy: {ed_results['ED_5y_R'][1]:.2f} kWh")
-print(f"CO₂ Emissions for 5 Years (Average Scenario): Norway: {co2_results['CO₂_5y_T'][1]:.2f} kg CO2, Italy: {co2_results['CO₂_5y_R'][1]:.2f} kg CO2")
-
-print("\nTotal Energy Demand (Thermal + Humidity) for 5 Years (Bad Scenario):")
-print(f"Norway: {ed_results['ED_5y_T'][2]:.2f} kWh, Italy: {ed_results['ED_5y_R'][2]:.2f} kWh")
-print(f"CO₂ Emissions for 5 Years (Bad Scenario): Norway: {co2_results['CO₂_5y_T'][2]:.2f} kg CO2, Italy: {co2_results['CO₂_5y_R'][2]:.2f} kg CO2")
-
-# Scenarios for 50 Years
-print("\nTotal Energy Demand (Thermal + Humidity) for 50 Years (Good Scenario):")
-print(f"Norway: {ed_results['ED_50y_T'][0]:.2f} kWh, Italy: {ed_results['ED_50y_R'][0]:.2f} kWh")
-print(f"CO₂ Emissions for 50 Years (Good Scenario): Norway: {co2_results['CO₂_50y_T'][0]:.2f} kg CO2, Italy: {co2_results['CO₂_50y_R'][0]:.2f} kg CO2")
-
-print("\nTotal Energy Demand (Thermal + Humidity) for 50 Years (Average Scenario):")
-print(f"Norway: {ed_results['ED_50y_T'][1]:.2f} kWh, Italy: {ed_results['ED_50y_R'][1]:.2f} kWh")
-print(f"CO₂ Emissions for 50 Years (Average Scenario): Norway: {co2_results['CO₂_50y_T'][1]:.2f} kg CO2, Italy: {co2_results['CO₂_50y_R'][1]:.2f} kg CO2")
-
-print("\nTotal Energy Demand (Thermal + Humidity) for 50 Years (Bad Scenario):")
-print(f"Norway: {ed_results['ED_50y_T'][2]:.2f} kWh, Italy: {ed_results['ED_50y_R'][2]:.2f} kWh")
-print(f"CO₂ Emissions for 50 Years (Bad Scenario): Norway: {co2_results['CO₂_50y_T'][2]:.2f} kg CO2, Italy: {co2_results['CO₂_50y_R'][2]:.2f} kg CO2")
+from ctamodel.emissions import co2_tensor, emissions_summary, load_emission_factors, site_countries
+from ctamodel.energy_demand import annual_ed_tensor
+from ctamodel.registry import load_registry
+
+# Sites, SSP pathways and storage scenarios
+registry = load_registry('sites.json')
+
+# Grid emission factors by country and year (kg CO₂ per kWh). The bundled
+# file holds the CoM 2021 factors (Norway 0.012, Italy 0.284), held
+# constant; add rows for later years to follow grid decarbonization.
+factors = load_emission_factors('data/emission_factors.csv')
+
+# Annual ED (thermal + humidity, kWh) for every site x pathway x scenario,
+# and annual and cumulative CO₂ (kg) in one broadcast over the tensor
+emissions = co2_tensor(annual_ed_tensor(registry), factors, site_countries(registry))
+
+# Total ED and CO₂ from 2015 up to the end of 2015 (1 year), 2020 (5 years)
+# and 2065 (50 years)
+periods = {"1y": 2015, "5y": 2020, "50y": 2065}
+summary = emissions_summary(emissions, 2015, periods.values())
+summary = summary.rename(columns={
+    f"{variable}_{end_year}": f"{variable}_{period}" for period, end_year in periods.items() for variable in ("ED", "CO2")
+})
+
+print("Total Energy Demand (Thermal + Humidity, kWh) and CO₂ Emissions (kg CO₂):")
+print(summary.to_string(index=False, float_format=lambda value: f"{value:.2f}"))
 
 '''
 ***ED based on SH***
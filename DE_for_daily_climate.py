@@ -0,0 +1,28 @@
+import pandas as pd
+from ctamodel.climate_data import load_climate
+from ctamodel.degradation import simulate_daily_climate
+
+# Constants
+ROAc0 = 13403.6  # Initial acetyl concentration (mol/m³)
+H2O0 = 2137.2  # Initial water concentration (mol/m³)
+HOAc0 = 52  # Initial acetic acid concentration (mol/m³)
+
+# Storage scenarios: cooling setpoint T_base (°C), as in the ED scripts
+T_base_values = {"Good": 2, "Average": 7, "Bad": 15}
+
+# Daily SSP2-4.5 climate for both cities
+climates = {
+    "Norway": load_climate('trondheim_temperature_SSP2-45.csv'),
+    "Italy": load_climate('rome_temperature_SSP2-45.csv'),
+}
+
+# Degradation with k(T) following the daily indoor temperature
+results = simulate_daily_climate(climates, T_base_values, HOAc0, ROAc0, H2O0)
+
+# Acetic acid concentration at the end of each year
+annual = pd.concat(
+    {site: df.groupby(df.index.year).last() for site, df in results.items()}, axis=1
+)
+annual.columns = [f"{scenario}_{site}" for site, scenario in annual.columns]
+annual.index.name = "Year"
+print(annual)
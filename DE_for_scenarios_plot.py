@@ -1,6 +1,10 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.integrate import solve_ivp
+from ctamodel.degradation import hoac_trajectory
+
+# Integration backend: 'analytic' for the exact propagator, or a solve_ivp
+# method such as 'RK45' for the numerical solver
+METHOD = 'analytic'
 
 # Constants for the model
 R = 8.314  # Ideal gas constant (J/(mol·K))
@@ -15,13 +19,6 @@ HOAc0 = 52  # Starting acetic acid concentration
 # Time span for simulation (50 years in seconds)
 time_span = (0, 50 * 365.25 * 24 * 60 * 60)  # 50 years
 
-# Define the ODE function
-def acetic_acid_concentration(t, HOAc, k):
-    ROAc = ROAc0 - HOAc
-    H2O = H2O0 - HOAc
-    dHOAc_dt = k * ROAc * H2O * HOAc
-    return dHOAc_dt
-
 # Define scenarios
 '''
 cases = {
@@ -44,24 +41,21 @@ for case, params in cases.items():
     k = A * np.exp(-Ea / (R * T))
     
     # Solve the ODE
-    solution = solve_ivp(
-        acetic_acid_concentration, time_span, [HOAc0],
-        args=(k,), method='RK45', t_eval=np.linspace(time_span[0], time_span[1], 100)
-    )
-    results[case] = solution
+    t = np.linspace(time_span[0], time_span[1], 100)
+    results[case] = (t, hoac_trajectory(k, t, HOAc0, ROAc0, H2O0, method=METHOD))
 
 # Plot the results
 plt.figure(figsize=(10, 6))
-for case, solution in results.items():
-    time_years = solution.t / (365.25 * 24 * 3600)  # Convert time to years
-    plt.plot(time_years, solution.y[0], label=case, color=cases[case]["color"])  # Apply specific color from cases
+for case, (t, HOAc) in results.items():
+    time_years = t / (365.25 * 24 * 3600)  # Convert time to years
+    plt.plot(time_years, HOAc, label=case, color=cases[case]["color"])  # Apply specific color from cases
 
 # Add a horizontal line for the starting point
 plt.axhline(y=HOAc0, color='blue', linestyle='--', label='Starting Point (52 mol/m³)')
 
 # Font size of tick labels
 plt.xticks(fontsize=16)
-plt.yticks(np.arange(0, np.max([sol.y[0].max() for sol in results.values()]) + 500, 500), fontsize=16)
+plt.yticks(np.arange(0, np.max([HOAc.max() for t, HOAc in results.values()]) + 500, 500), fontsize=16)
 
 # Add labels, title, and legend
 # plt.title("Increase in Acetic Acid Concentration in CTA Over 50 Years")
@@ -0,0 +1,180 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ctamodel.climate_data import load_climate, load_climate_frame, parse_climate_csv
+from ctamodel.degradation import hoac_trajectory, rate_constant, simulate_degradation_grid
+from ctamodel.degree_days import calculate_cdd_matrix
+from ctamodel.energy_demand import build_ed_index, calculate_sh_method1, cumulative_ed_table
+
+# Times each stage of the ED and degradation pipelines on the bundled data,
+# checks the outputs against the committed result CSVs and compares the
+# timings with a JSON baseline.
+#
+#   python benchmarks/run_benchmarks.py                 # report against baseline
+#   python benchmarks/run_benchmarks.py --save-baseline # record a new baseline
+
+BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+CLIMATE_FILES = {
+    "Norway": os.path.join(ROOT, 'trondheim_temperature_SSP2-45.csv'),
+    "Italy": os.path.join(ROOT, 'rome_temperature_SSP2-45.csv'),
+}
+U_values = {"Norway": 0.18, "Italy": 0.32}
+RH_values = {"Good": 0.30, "Average": 0.50, "Bad": 0.70}
+T_base_values = {"Good": 2, "Average": 7, "Bad": 15}
+
+# Independent reference for the ED pipeline: the cumulative ED totals (kWh,
+# rounded to whole kWh) for 1, 5 and 50 years from 2015, as typed into the
+# original CO2-calculations.py from the first implementation's output.
+# cumulative_energy_demand_50_years.csv is not used for this check, since
+# it is regenerated by the same pipeline it would be checking.
+REFERENCE_ED = {
+    2015: {"Good_Norway": 2470, "Good_Italy": 14533, "Average_Norway": 1018, "Average_Italy": 9627,
+           "Bad_Norway": 125, "Bad_Italy": 4048},
+    2020: {"Good_Norway": 12264, "Good_Italy": 88726, "Average_Norway": 4786, "Average_Italy": 58644,
+           "Bad_Norway": 557, "Bad_Italy": 23772},
+    2065: {"Good_Norway": 136836, "Good_Italy": 777560, "Average_Norway": 61510, "Average_Italy": 528332,
+           "Bad_Norway": 10212, "Bad_Italy": 223831},
+}
+
+# Tolerances for the accuracy checks (relative). The ED totals are compared
+# after rounding to whole kWh like the reference, so they must agree
+# exactly. The committed degradation CSV was written by RK45 with default
+# tolerances, which the analytic propagator deviates from by up to about
+# 0.1%.
+TOLERANCES = {
+    'cumulative_ed': 0.0,
+    'annual_degradation': 2e-3,
+}
+
+# Best wall time of `repeat` calls; returns (seconds, last result)
+def time_stage(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def max_relative_error(actual, expected):
+    actual = np.asarray(actual, dtype=float)
+    expected = np.asarray(expected, dtype=float)
+    return float(np.max(np.abs(actual - expected) / np.abs(expected)))
+
+def run(repeat):
+    timings = {}
+    checks = {}
+
+    timings['climate_parse'], _ = time_stage(
+        lambda: {site: parse_climate_csv(path) for site, path in CLIMATE_FILES.items()}, repeat)
+    timings['climate_cache_load'], frames = time_stage(
+        lambda: {site: load_climate_frame(path) for site, path in CLIMATE_FILES.items()}, repeat)
+
+    def sh():
+        return {site: np.column_stack([calculate_sh_method1(df['Tavg[C]'].to_numpy(), RH) for RH in RH_values.values()])
+                for site, df in frames.items()}
+    timings['sh_method1'], sh_values = time_stage(sh, repeat)
+
+    def cdd():
+        return {site: calculate_cdd_matrix(df['Tmin[C]'], df['Tmax[C]'], df['Tavg[C]'], list(T_base_values.values()))
+                for site, df in frames.items()}
+    timings['calculate_cdd'], cdd_values = time_stage(cdd, repeat)
+
+    for site, df in frames.items():
+        df[[f'SH_{scenario}' for scenario in RH_values]] = sh_values[site]
+        df[[f'CDD_{scenario}' for scenario in T_base_values]] = cdd_values[site]
+
+    def annual_groupby():
+        return {site: (df.groupby('year')[[f'CDD_{scenario}' for scenario in T_base_values]].sum(),
+                       df.groupby('year')[[f'SH_{scenario}' for scenario in RH_values]].mean())
+                for site, df in frames.items()}
+    timings['annual_groupby'], annual = time_stage(annual_groupby, repeat)
+
+    def cumulative():
+        indices = {site: build_ed_index(CDD, SH) for site, (CDD, SH) in annual.items()}
+        return cumulative_ed_table(indices, U_values, 2015, 2065)
+    timings['cumulative_ed'], cumulative_ed = time_stage(cumulative, repeat)
+
+    expected = pd.DataFrame.from_dict(REFERENCE_ED, orient='index')
+    actual = cumulative_ed.set_index('Year').loc[expected.index, expected.columns]
+    checks['cumulative_ed'] = max_relative_error(np.round(actual), expected)
+
+    def degradation_grid():
+        return simulate_degradation_grid(
+            [7, 14, 21, 28], [6, 12, 18, 24, 36], datetime(2015, 1, 1), datetime(2055, 1, 1),
+            {"winter": 273.15 + 18, "summer": 273.15 + 25, "spring/autumn": 273.15 + 18}, 275.15)
+    timings['simulate_degradation_grid'], _ = time_stage(degradation_grid, repeat)
+
+    expected = pd.read_csv(os.path.join(ROOT, 'acetic_acid_concentration_over_50_years.csv'))
+    t_eval = expected['Year'].to_numpy(dtype=float) * 365.25 * 24 * 60 * 60
+
+    def annual_degradation():
+        return {column: hoac_trajectory(rate_constant(float(column.replace('°C', '')) + 273.15), t_eval)
+                for column in expected.columns.drop('Year')}
+    timings['annual_degradation'], curves = time_stage(annual_degradation, repeat)
+    checks['annual_degradation'] = max(max_relative_error(curves[column], expected[column]) for column in curves)
+
+    return timings, checks
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ED and degradation pipeline stages")
+    parser.add_argument('--repeat', type=int, default=10, help="timed runs per stage (best is kept)")
+    parser.add_argument('--baseline', default=BASELINE, help="baseline JSON file")
+    parser.add_argument('--save-baseline', action='store_true', help="write this run as the new baseline")
+    parser.add_argument('--threshold', type=float, default=1.5,
+                        help="report a regression when a stage is this many times slower than the baseline")
+    args = parser.parse_args()
+
+    load_climate(CLIMATE_FILES["Norway"])  # make sure the cache exists before timing
+    load_climate(CLIMATE_FILES["Italy"])
+    timings, checks = run(args.repeat)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)['timings']
+
+    failed = False
+    print(f"{'stage':<28}{'time [ms]':>12}{'baseline [ms]':>16}{'speedup':>10}")
+    for stage, seconds in timings.items():
+        line = f"{stage:<28}{seconds * 1000:>12.2f}"
+        if stage in baseline:
+            speedup = baseline[stage] / seconds
+            line += f"{baseline[stage] * 1000:>16.2f}{speedup:>9.2f}x"
+            if speedup < 1 / args.threshold:
+                line += "  REGRESSION"
+        print(line)
+
+    print()
+    for check, error in checks.items():
+        ok = error <= TOLERANCES[check]
+        failed |= not ok
+        print(f"{check:<28}max rel. error {error:.2e} (tolerance {TOLERANCES[check]:.0e}) {'ok' if ok else 'FAILED'}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'recorded': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'repeat': args.repeat,
+                'timings': timings,
+                'checks': checks,
+            }, f, indent=2)
+            f.write('\n')
+        print(f"\nBaseline written to {args.baseline}")
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+from ctamodel.calibration import calibrate, load_table, predict_table, save_parameters
+
+# Experimental tables to fit (free acidity of CTA film aged at 70°C)
+tables = [load_table('data/ahmad_table1.json')]
+
+# All tables are at 70°C, which only determines k(70°C): fit A and keep the
+# activation energy of the storage scripts fixed. With tables at several
+# temperatures, fit ("A", "Ea") instead.
+FIT = ("A",)
+FIXED = {"Ea": 70734}
+
+# Independent least-squares runs from scattered starting points, spread
+# across a process pool
+N_STARTS = 8
+WORKERS = None
+
+if __name__ == "__main__":
+    result = calibrate(tables, fit=FIT, fixed=FIXED, n_starts=N_STARTS, workers=WORKERS)
+
+    print(f"Fitted to {', '.join(result['tables'])} ({result['n_observations']} points, "
+          f"RMSE {result['rmse']:.3f} in ln(free acidity))")
+    for name in result['fit']:
+        low, high = result['ci'][name]
+        print(f"{name} = {result['parameters'][name]:.6g}  "
+              f"({100 * result['confidence']:.0f}% CI {low:.6g} .. {high:.6g})")
+
+    for table in tables:
+        predicted = predict_table(table, result['parameters'])
+        print(f"\n{table['name']}\ntime\tobserved\tfitted")
+        for t, observed, fitted in zip(table['time'], table['value'], predicted):
+            print(f"{t}\t{observed}\t{fitted:.3f}")
+
+    # Load with ctamodel.calibration.load_parameters for the storage and
+    # exhibition simulations
+    save_parameters(result, 'calibrated_parameters.json')
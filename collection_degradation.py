@@ -0,0 +1,38 @@
+import numpy as np
+from datetime import datetime
+from ctamodel.collection import CollectionStore, exhibition_schedule, vault
+
+# Storage vaults and exhibition schedules (temperatures in K)
+season_temps = {"winter": 273.15 + 18, "summer": 273.15 + 25, "spring/autumn": 273.15 + 18}
+schedules = {
+    "vault_2C": vault(275.15),
+    "vault_7C": vault(280.15),
+    "vault_15C": vault(288.15),
+    "exhibition_14d_6m": exhibition_schedule(14, 6, season_temps, 275.15),
+}
+
+# Synthetic collection of 100k reels: measured HOAc0 and water content per
+# reel, most of them in the cold vaults
+N_OBJECTS = 100_000
+rng = np.random.default_rng(0)
+HOAc0 = rng.uniform(30, 80, N_OBJECTS)  # mol/m³
+H2O0 = rng.normal(2137.2, 200, N_OBJECTS)  # mol/m³
+home = rng.choice(list(schedules), N_OBJECTS, p=[0.5, 0.3, 0.15, 0.05])
+
+store = CollectionStore(schedules, datetime(2015, 1, 1), datetime(2101, 1, 1))
+objects = store.add_objects(HOAc0, home, H2O0=H2O0)
+
+# 500 reels on loan to an exhibition for a year
+store.add_loan(objects[:500], "exhibition_14d_6m", datetime(2025, 3, 1), datetime(2026, 3, 1))
+
+# Objects above the threshold by each date, answered in exposure space
+THRESHOLD = 200  # mol/m³
+for year in range(2030, 2101, 10):
+    print(f"{year}: {store.count_above(THRESHOLD, datetime(year, 1, 1))} objects above {THRESHOLD} mol/m³")
+
+# Step the collection to 2040 and report the state per home schedule
+store.advance_to(datetime(2040, 1, 1))
+HOAc = store.hoac()
+for i, name in enumerate(store.schedule_names):
+    in_schedule = store.schedule == i
+    print(f"{name}: median HOAc in 2040 {np.median(HOAc[in_schedule]):.1f} mol/m³")
@@ -0,0 +1,29 @@
+import pandas as pd
+from ctamodel.climate_data import load_climate
+from ctamodel.degree_hours import degree_hour_report, summarize_degree_hour_report
+
+# Storage scenarios: cooling setpoint T_base (°C)
+T_base_values = {"Good": 2, "Average": 7, "Bad": 15}
+
+# U-values
+U_values = {"Norway": 0.18, "Italy": 0.32}
+
+# Daily SSP2-4.5 climate for both cities
+climates = {
+    "Norway": load_climate('trondheim_temperature_SSP2-45.csv'),
+    "Italy": load_climate('rome_temperature_SSP2-45.csv'),
+}
+
+# Hour of the daily temperature maximum in the synthesized diurnal profile
+PEAK_HOUR = 15
+
+# Year-by-year degree-hour vs four-case daily CDD comparison
+report = degree_hour_report(climates, U_values, T_base_values, peak_hour=PEAK_HOUR)
+report.to_csv("degree_hour_comparison.csv", index=False)
+
+pd.set_option("display.width", 160)
+pd.set_option("display.max_columns", None)
+print("Totals over the whole series (hourly model / daily CDD):")
+print(summarize_degree_hour_report(report))
+print("\nED_ratio also contains the factor 24/8760 between degree-hours and the")
+print("hours_per_year scaling in calculate_ed; CDD_ratio compares the load shapes.")
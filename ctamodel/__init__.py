@@ -0,0 +1,58 @@
+import importlib
+
+# Energy demand and acetic acid degradation model for cellulose triacetate
+# film collections. The public functions are re-exported here but their
+# modules are only imported on first use, so `import ctamodel` stays cheap and
+# scipy/matplotlib are never loaded by jobs that do not need them.
+
+_EXPORTS = {
+    'climate_data': ['load_climate', 'load_climate_frame', 'parse_climate_csv', 'iter_climate_chunks'],
+    'degree_days': ['calculate_cdd', 'calculate_cdd_matrix', 'build_cdd_index', 'annual_cdd'],
+    'degree_hours': [
+        'diurnal_profile', 'daily_degree_hours', 'annual_degree_hours', 'calculate_ed_degree_hours',
+        'degree_hour_report', 'summarize_degree_hour_report',
+    ],
+    'energy_demand': [
+        'calculate_sh_method1', 'calculate_ed', 'calculate_humidity_ed', 'stream_annual_cdd_sh',
+        'build_ed_index', 'build_ed_index_from_daily', 'cumulative_ed', 'cumulative_ed_table',
+        'annual_ed_tensor', 'select_ed', 'ed_tensor_frame', 'group_sums',
+    ],
+    'time_index': ['TimeIndex'],
+    'climate_view': ['ClimateView'],
+    'registry': ['load_registry', 'make_registry', 'site_names', 'scenario_names', 'U_values'],
+    'emissions': [
+        'load_emission_factors', 'emission_factor_matrix', 'site_countries', 'co2_tensor', 'emissions_frame',
+        'emissions_summary',
+    ],
+    'degradation': [
+        'rate_constant', 'acetic_acid_concentration', 'hoac_after_exposure', 'propagate_hoac', 'advance_hoac',
+        'exposure_to_reach', 'hoac_trajectory', 'simulate_degradation', 'simulate_degradation_grid', 'indoor_temperature',
+        'simulate_daily_climate', 'daily_exposure',
+    ],
+    'lifetime': [
+        'time_to_threshold', 'cycle_time_to_threshold', 'daily_climate_time_to_threshold', 'time_to_threshold_ode',
+    ],
+    'phase_operators': ['PhaseOperator', 'PhaseOperatorCache', 'phase_operator'],
+    'optimize': ['site_tables', 'evaluate_schedules', 'pareto_front', 'optimize_schedules'],
+    'sweep': ['run_sweep'],
+    'collection': ['CollectionStore', 'vault', 'exhibition_schedule'],
+    'pipeline': ['Pipeline', 'PIPELINE', 'DEFAULT_PARAMS'],
+    'figures': ['lttb', 'render_figure', 'render_figures', 'build_figure_specs', 'render_report'],
+    'calibration': ['load_table', 'predict_table', 'calibrate', 'save_parameters', 'load_parameters'],
+    'uncertainty': ['sample_parameters', 'propagate_samples', 'storage_uncertainty_bands'],
+}
+
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_MODULE_OF)
+
+def __getattr__(name):
+    module = _MODULE_OF.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,214 @@
+import json
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from . import degradation
+from .degradation import hoac_after_exposure, hoac_trajectory, rate_constant
+
+# Least-squares calibration of the kinetic parameters against experimental
+# tables such as data/ahmad_table1.json. A table is one isothermal
+# experiment:
+#
+#   {"name": ..., "T": K, "HOAc0": ..., "ROAc0": ..., "H2O0": ...,
+#    "observable": "free_acidity" or "HOAc", "time_unit": "days" or "seconds",
+#    "time": [...], "value": [...]}
+#
+# Free acidity (mL of 0.1 M NaOH per g) is HOAc / FREE_ACIDITY_FACTOR, as in
+# table1_Ahmad.py. Any of A, Ea, HOAc0, ROAc0 and H2O0 can be fitted; a
+# fitted initial concentration replaces the value of every table, the others
+# come from the tables or from `fixed`. A is fitted as ln A so that the
+# search spans decades, and rates use seconds so the result plugs straight
+# into the storage and exhibition simulations.
+#
+# Note that tables at a single temperature only pin down k(T), not A and Ea
+# separately: fit one of them and fix the other, or add tables at other
+# temperatures.
+
+FREE_ACIDITY_FACTOR = 130  # mol/m³ of HOAc per mL of 0.1 M NaOH per g
+PARAMETERS = ('A', 'Ea', 'HOAc0', 'ROAc0', 'H2O0')
+TIME_UNITS = {'seconds': 1, 'days': 24 * 3600}
+
+def load_table(path):
+    with open(path) as f:
+        table = json.load(f)
+    if table.get('observable', 'HOAc') not in ('HOAc', 'free_acidity'):
+        raise ValueError(f"{path}: observable must be 'HOAc' or 'free_acidity'")
+    if len(table['time']) != len(table['value']):
+        raise ValueError(f"{path}: time and value must have the same length")
+    return table
+
+# Parameter vector (ln A for A) <-> {name: value}
+def _to_vector(values, fit):
+    return np.array([np.log(values[name]) if name == 'A' else values[name] for name in fit], dtype=float)
+
+def _from_vector(x, fit):
+    return {name: float(np.exp(value)) if name == 'A' else float(value) for name, value in zip(fit, x)}
+
+# Model prediction of a table's observable at its time points
+def predict_table(table, parameters, method='analytic'):
+    values = {name: parameters.get(name, table.get(name, getattr(degradation, name))) for name in PARAMETERS}
+    t = np.asarray(table['time'], dtype=float) * TIME_UNITS[table.get('time_unit', 'seconds')]
+    k = rate_constant(table['T'], values['A'], values['Ea'])
+    if method == 'analytic':
+        HOAc = hoac_after_exposure(values['HOAc0'], k * t, values['ROAc0'], values['H2O0'])
+    else:
+        # solve_ivp starts at t_eval[0], so prepend t = 0 if needed
+        t_eval = t if t[0] == 0 else np.concatenate([[0.0], t])
+        HOAc = hoac_trajectory(k, t_eval, values['HOAc0'], values['ROAc0'], values['H2O0'], method=method,
+                               rtol=1e-10, atol=1e-12)[len(t_eval) - len(t):]
+    return HOAc / FREE_ACIDITY_FACTOR if table.get('observable', 'HOAc') == 'free_acidity' else HOAc
+
+# Residual function over all tables, with forward solves cached on the exact
+# parameter vector: the optimizer, the finite-difference Jacobian and the
+# final covariance step revisit the same points.
+def make_residuals(tables, fit, fixed=None, method='analytic', residual='log', cache_size=4096):
+    fixed = dict(fixed or {})
+    observed = np.concatenate([np.asarray(table['value'], dtype=float) for table in tables])
+    if residual == 'log':
+        observed = np.log(observed)
+    elif residual != 'absolute':
+        raise ValueError("residual must be 'log' or 'absolute'")
+
+    @lru_cache(maxsize=cache_size)
+    def forward(x):
+        parameters = dict(fixed, **_from_vector(np.array(x), fit))
+        return np.concatenate([predict_table(table, parameters, method) for table in tables])
+
+    def residuals(x):
+        try:
+            predicted = forward(tuple(float(value) for value in x))
+        except ValueError:
+            # Initial concentrations outside the valid range
+            return np.full(observed.shape, 1e6)
+        if residual == 'log':
+            with np.errstate(divide='ignore', invalid='ignore'):
+                predicted = np.log(predicted)
+            predicted = np.where(np.isfinite(predicted), predicted, -1e6)
+        return predicted - observed
+
+    residuals.forward = forward
+    return residuals
+
+# Worker entry point: one local least-squares run from x0
+def _fit_from_start(tables, fit, fixed, method, residual, x0, lower, upper):
+    from scipy.optimize import least_squares
+
+    solution = least_squares(
+        make_residuals(tables, fit, fixed, method, residual), x0, bounds=(lower, upper), x_scale='jac',
+        xtol=1e-12, ftol=1e-12, gtol=1e-12,
+    )
+    return solution.x, float(solution.cost), solution.jac, solution.fun
+
+# Default search box in vector space (ln A for A). Explicit bounds passed to
+# calibrate are given as (low, high) in the parameter's own units.
+def _default_bounds(name, value):
+    if name == 'A':
+        return np.log(value) - 20, np.log(value) + 20
+    if name == 'Ea':
+        return 20e3, 200e3
+    return 0.0, np.inf
+
+# Fit the `fit` parameters to the tables. initial holds starting values
+# (defaulting to the point values in degradation.py) and fixed the values of
+# parameters that are neither fitted nor given by the tables. n_starts local
+# fits start from points drawn uniformly in ±spread around the initial
+# values (spread in ln A for A, relative for the others) and run across a
+# process pool; workers=1 runs in-process, None uses one worker per core.
+#
+# Returns a dict with the best-fit 'parameters', their 'stderr' and
+# 'ci' (confidence intervals at `confidence` from the Jacobian at the
+# optimum; intervals for A come from ln A, so they are asymmetric), the
+# 'correlation' matrix, 'cost', 'rmse', the number of observations and the
+# settings of the fit.
+def calibrate(tables, fit=('A', 'Ea'), fixed=None, initial=None, method='analytic', residual='log',
+              n_starts=16, spread=None, seed=0, workers=1, confidence=0.95, bounds=None):
+    from scipy import stats
+
+    fit = list(fit)
+    unknown = set(fit) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"cannot fit {sorted(unknown)}, expected a subset of {PARAMETERS}")
+    fixed = dict(fixed or {})
+    initial = {name: (initial or {}).get(name, fixed.get(name, getattr(degradation, name))) for name in fit}
+    spread = dict({'A': 3.0, 'Ea': 0.2, 'HOAc0': 0.5, 'ROAc0': 0.1, 'H2O0': 0.5}, **(spread or {}))
+    bounds = dict(bounds or {})
+
+    x_initial = _to_vector(initial, fit)
+    box = [
+        [np.log(limit) if name == 'A' else limit for limit in bounds[name]] if name in bounds
+        else _default_bounds(name, initial[name])
+        for name in fit
+    ]
+    lower = np.array([low for low, _ in box], dtype=float)
+    upper = np.array([high for _, high in box], dtype=float)
+
+    rng = np.random.default_rng(seed)
+    starts = [x_initial]
+    for _ in range(n_starts - 1):
+        offsets = rng.uniform(-1, 1, len(fit))
+        x0 = np.array([
+            x + offset * spread[name] * (1 if name == 'A' else abs(x))
+            for name, x, offset in zip(fit, x_initial, offsets)
+        ])
+        starts.append(x0)
+    starts = [np.clip(x0, lower, upper) for x0 in starts]
+
+    arguments = [(tables, fit, fixed, method, residual, x0, lower, upper) for x0 in starts]
+    if workers == 1:
+        runs = [_fit_from_start(*args) for args in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            runs = list(pool.map(_fit_from_start, *zip(*arguments)))
+    x, cost, jac, fun = min(runs, key=lambda run: run[1])
+
+    n_obs = len(fun)
+    dof = n_obs - len(fit)
+    covariance = np.full((len(fit), len(fit)), np.nan)
+    if dof > 0:
+        s2 = 2 * cost / dof
+        JTJ = jac.T @ jac
+        if np.linalg.matrix_rank(JTJ) == len(fit):
+            covariance = s2 * np.linalg.inv(JTJ)
+    stderr = np.sqrt(np.diag(covariance))
+    t_value = stats.t.ppf(0.5 + confidence / 2, dof) if dof > 0 else np.nan
+
+    parameters = dict(fixed, **_from_vector(x, fit))
+    ci = {}
+    for name, value, se in zip(fit, x, stderr):
+        low, high = value - t_value * se, value + t_value * se
+        ci[name] = [float(np.exp(low)), float(np.exp(high))] if name == 'A' else [float(low), float(high)]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        correlation = covariance / np.outer(stderr, stderr)
+
+    return {
+        'parameters': parameters,
+        'fit': fit,
+        # Standard errors are of ln A for A
+        'stderr': {name: float(se) for name, se in zip(fit, stderr)},
+        'ci': ci,
+        'confidence': confidence,
+        'correlation': correlation.tolist(),
+        'cost': cost,
+        'rmse': float(np.sqrt(2 * cost / n_obs)),
+        'n_observations': n_obs,
+        'residual': residual,
+        'method': method,
+        'tables': [table.get('name', '') for table in tables],
+    }
+
+# Write a calibration result as JSON
+def save_parameters(result, path):
+    with open(path, 'w') as f:
+        json.dump(result, f, indent=2, allow_nan=True)
+        f.write('\n')
+
+# Read calibrated parameters back as keyword arguments for the simulations,
+# e.g. simulate_degradation_grid(..., **load_parameters(path)). Only the
+# kinetic constants are returned by default, since fitted initial
+# concentrations describe the experiment's film rather than the collection.
+def load_parameters(path, names=('A', 'Ea')):
+    with open(path) as f:
+        parameters = json.load(f)['parameters']
+    return {name: parameters[name] for name in names if name in parameters}
@@ -0,0 +1,361 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+from .profiling import span
+
+# Batch runner for ED and degradation jobs described in a JSON scenario spec:
+#
+#   python -m ctamodel run scenarios.json
+#   python -m ctamodel run scenarios.json --only ed_50_years annual_degradation
+#
+# A spec holds an optional "parameters" block with degradation constants
+# shared by all jobs (HOAc0, ROAc0, H2O0, A, Ea), optionally a
+# "parameters_file" with A and Ea from calibrate_kinetics.py (the
+# "parameters" block takes precedence), and a list of "jobs", each
+# with a "name", a "type" and the settings of that type (see the job_*
+# functions below). Temperatures in a spec are in °C and relative paths are
+# resolved against the directory of the spec file. A job with an "output"
+# writes its table there (CSV) or its figure (PNG); otherwise the table is
+# printed.
+#
+# All jobs run in one process: climate files are loaded once and shared, a
+# "plot" job can draw the table of an earlier job by name, and the modules a
+# job needs (including scipy and matplotlib) are only imported when a job of
+# that type runs.
+
+DEGRADATION_PARAMETERS = ('HOAc0', 'ROAc0', 'H2O0', 'A', 'Ea')
+
+class Context:
+    def __init__(self, base_dir, parameters):
+        self.base_dir = base_dir
+        self.parameters = parameters
+        self.results = {}
+        self._climates = {}
+
+    def path(self, path):
+        return os.path.join(self.base_dir, path)
+
+    # Typed climate columns, loaded once per file for the whole batch
+    def climate(self, path):
+        path = os.path.abspath(self.path(path))
+        if path not in self._climates:
+            from .climate_data import load_climate
+            self._climates[path] = load_climate(path)
+        return self._climates[path]
+
+    # Degradation constants of a job: job settings override the shared ones
+    def degradation_parameters(self, job):
+        parameters = {name: self.parameters[name] for name in DEGRADATION_PARAMETERS if name in self.parameters}
+        parameters.update({name: job[name] for name in DEGRADATION_PARAMETERS if name in job})
+        return parameters
+
+# Cumulative ED (thermal + humidity) from start_year up to each year until
+# end_year, one column per <scenario>_<site>.
+#   sites: {label: {"climate": csv, "U_value": W/(m²K)}}
+#   T_base_values, RH_values: {scenario: value}
+def job_cumulative_ed(job, context):
+    import numpy as np
+    import pandas as pd
+    from .degree_days import calculate_cdd_matrix
+    from .energy_demand import build_ed_index_from_daily, calculate_sh_method1, cumulative_ed_table
+    from .registry import U_values
+
+    T_base_values, RH_values = job['T_base_values'], job['RH_values']
+    indices = {}
+    for site, settings in job['sites'].items():
+        climate = context.climate(settings['climate'])
+        Tavg = np.asarray(climate['Tavg[C]'], dtype=float)
+        CDD = pd.DataFrame(
+            calculate_cdd_matrix(climate['Tmin[C]'], climate['Tmax[C]'], Tavg, list(T_base_values.values())),
+            columns=[f'CDD_{scenario}' for scenario in T_base_values],
+        )
+        SH = pd.DataFrame({f'SH_{scenario}': calculate_sh_method1(Tavg, RH) for scenario, RH in RH_values.items()})
+        indices[site] = build_ed_index_from_daily(climate['year'], CDD, SH)
+    return cumulative_ed_table(indices, U_values(job), job['start_year'], job['end_year'])
+
+# Degree-hour model vs daily CDD, one row per (site, scenario, year).
+#   sites: {label: {"climate": csv, "U_value": W/(m²K)}},
+#   T_base_values: {scenario: °C}, peak_hour: optional (default 15)
+def job_degree_hour_report(job, context):
+    from .degree_hours import degree_hour_report
+    from .registry import U_values
+
+    climates = {site: context.climate(settings['climate']) for site, settings in job['sites'].items()}
+    return degree_hour_report(climates, U_values(job), job['T_base_values'], peak_hour=job.get('peak_hour', 15))
+
+# Annual CDD, SH or ED for every site x pathway x scenario of a registry
+# file (see registry.py), one column per (site, pathway, scenario).
+#   registry: JSON config, variable: 'ED' (default), 'CDD' or 'SH'
+def job_ed_tensor(job, context):
+    from .energy_demand import annual_ed_tensor, ed_tensor_frame
+    from .registry import load_registry
+
+    tensor = annual_ed_tensor(load_registry(context.path(job['registry'])), load=context.climate)
+    return ed_tensor_frame(tensor, job.get('variable', 'ED')).reset_index()
+
+# Annual and cumulative ED and CO₂ for every site x pathway x scenario of a
+# registry file, one row per (site, pathway, scenario, year); with
+# end_years, totals from start_year up to each end year instead.
+#   registry: JSON config, emission_factors: factor file (see emissions.py),
+#   start_year, end_years: optional
+def job_emissions(job, context):
+    from .emissions import co2_tensor, emissions_frame, emissions_summary, load_emission_factors, site_countries
+    from .energy_demand import annual_ed_tensor
+    from .registry import load_registry
+
+    registry = load_registry(context.path(job['registry']))
+    emissions = co2_tensor(annual_ed_tensor(registry, load=context.climate),
+                           load_emission_factors(context.path(job['emission_factors'])), site_countries(registry))
+    if 'end_years' in job:
+        return emissions_summary(emissions, job['start_year'], job['end_years'])
+    return emissions_frame(emissions)
+
+# HOAc at constant storage temperatures, sampled once a year.
+#   temperatures: {label: °C}, years: length of the run, method: optional
+def job_degradation_curves(job, context):
+    import numpy as np
+    import pandas as pd
+    from .degradation import hoac_trajectory, rate_constant
+
+    parameters = context.degradation_parameters(job)
+    rate_kwargs = {name: parameters.pop(name) for name in ('A', 'Ea') if name in parameters}
+
+    years = np.arange(0, job['years'] + 1)
+    t_eval = years * 365.25 * 24 * 60 * 60
+    data = {"Year": years}
+    for label, T in job['temperatures'].items():
+        k = rate_constant(T + 273.15, **rate_kwargs)
+        data[label] = hoac_trajectory(k, t_eval, method=job.get('method', 'analytic'), **parameters)
+    return pd.DataFrame(data)
+
+# Monte Carlo quantile bands of the constant-temperature curves.
+#   temperatures: {label: °C}, years, distributions: {parameter: number or
+#   distribution dict} (see uncertainty.py), n_draws, quantiles, seed
+def job_degradation_uncertainty(job, context):
+    from .uncertainty import storage_uncertainty_bands
+
+    distributions = dict(context.degradation_parameters(job), **job.get('distributions', {}))
+    bands = storage_uncertainty_bands(
+        distributions, {label: T + 273.15 for label, T in job['temperatures'].items()}, years=job['years'],
+        n_draws=job.get('n_draws', 100_000), quantiles=job.get('quantiles', (0.05, 0.25, 0.5, 0.75, 0.95)),
+        seed=job.get('seed'),
+    )
+    bands.columns = [f"{case}_q{quantile:g}" for case, quantile in bands.columns]
+    return bands.reset_index()
+
+# Final HOAc for every (cold storage months, exhibition days) calendar.
+#   exhibition_lengths (days), cold_storage_lengths (months), start_date,
+#   end_date (ISO dates), season_temps: {winter, summer, spring/autumn: °C},
+#   cold_storage_temp (°C), method: optional
+def job_exhibition_grid(job, context):
+    from datetime import datetime
+
+    import pandas as pd
+    from .degradation import simulate_degradation_grid
+
+    season_temps = {season: T + 273.15 for season, T in job['season_temps'].items()}
+    matrix = simulate_degradation_grid(
+        job['exhibition_lengths'], job['cold_storage_lengths'],
+        datetime.fromisoformat(job['start_date']), datetime.fromisoformat(job['end_date']),
+        season_temps, job['cold_storage_temp'] + 273.15, method=job.get('method', 'analytic'),
+        **context.degradation_parameters(job),
+    )
+    return pd.DataFrame(
+        matrix,
+        index=pd.Index(job['cold_storage_lengths'], name='cold_storage_months'),
+        columns=[f"{days} days" for days in job['exhibition_lengths']],
+    )
+
+# Years from start_date until HOAc reaches each threshold for every
+# (cold storage months, exhibition days) calendar, shortest lifetimes first;
+# calendars that stay below a threshold until end_date are left empty.
+#   the exhibition_grid settings plus thresholds: [mol/m³, ...]
+def job_exhibition_lifetime(job, context):
+    from datetime import datetime
+
+    import numpy as np
+    import pandas as pd
+    from .lifetime import cycle_time_to_threshold
+
+    season_temps = {season: T + 273.15 for season, T in job['season_temps'].items()}
+    seconds = cycle_time_to_threshold(
+        job['exhibition_lengths'], job['cold_storage_lengths'], job['thresholds'],
+        datetime.fromisoformat(job['start_date']), datetime.fromisoformat(job['end_date']),
+        season_temps, job['cold_storage_temp'] + 273.15, **context.degradation_parameters(job),
+    )
+    cold_months, exhibition_days = np.meshgrid(job['cold_storage_lengths'], job['exhibition_lengths'], indexing='ij')
+    table = pd.DataFrame({'cold_storage_months': cold_months.ravel(), 'exhibition_days': exhibition_days.ravel()})
+    for i, threshold in enumerate(job['thresholds']):
+        years = seconds[:, :, i].ravel() / (365.25 * 24 * 3600)
+        table[f"years_to_{threshold:g}"] = np.where(np.isfinite(years), years, np.nan)
+    return table.sort_values(list(table.columns[2:]), na_position='last', kind='stable').reset_index(drop=True)
+
+# Pareto front of vault setpoints and exhibition calendars: lowest ED and
+# CO₂, most exhibition time, with HOAc at most max_HOAc at the end of
+# end_year.
+#   sites: {label: {"climate": csv, "U_value": W/(m²K), "country": optional}}
+#   emission_factors: factor file (see emissions.py), looked up by country
+#   (the site label by default)
+#   T_bases (°C), RHs, exhibition_lengths (days), cold_storage_lengths
+#   (months): candidate values; start_year, end_year, max_HOAc,
+#   season_temps: {winter, summer, spring/autumn: °C}, workers: optional
+def job_schedule_optimization(job, context):
+    from .emissions import emission_factor_matrix, load_emission_factors
+    from .optimize import optimize_schedules
+    from .registry import U_values
+
+    sites = job['sites']
+    countries = [settings.get('country', site) for site, settings in sites.items()]
+    factors = emission_factor_matrix(load_emission_factors(context.path(job['emission_factors'])), countries,
+                                     range(job['start_year'], job['end_year'] + 1))
+    return optimize_schedules(
+        {site: context.climate(settings['climate']) for site, settings in sites.items()},
+        U_values(job),
+        dict(zip(sites, factors)),
+        job['T_bases'], job['RHs'], job['exhibition_lengths'], job['cold_storage_lengths'],
+        job['start_year'], job['end_year'], job['max_HOAc'],
+        {season: T + 273.15 for season, T in job['season_temps'].items()},
+        workers=job.get('workers'), **context.degradation_parameters(job),
+    )
+
+# HOAc at the end of each year with k(T) following the daily indoor
+# temperature, one column per <scenario>_<site>.
+#   sites: {label: {"climate": csv}}, T_base_values: {scenario: °C}
+def job_daily_degradation(job, context):
+    import pandas as pd
+    from .degradation import simulate_daily_climate
+
+    climates = {site: context.climate(settings['climate']) for site, settings in job['sites'].items()}
+    results = simulate_daily_climate(climates, job['T_base_values'], **context.degradation_parameters(job))
+    annual = pd.concat({site: df.groupby(df.index.year).last() for site, df in results.items()}, axis=1)
+    annual.columns = [f"{scenario}_{site}" for site, scenario in annual.columns]
+    annual.index.name = "Year"
+    return annual.reset_index()
+
+# Line plot of a table: either the result of an earlier job ("source") or a
+# CSV file ("input"). x names the x column; columns defaults to all others.
+def job_plot(job, context):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import pandas as pd
+
+    if 'source' in job:
+        table = context.results[job['source']]
+    else:
+        table = pd.read_csv(context.path(job['input']))
+    x = job.get('x', table.columns[0])
+    columns = job.get('columns', [column for column in table.columns if column != x])
+
+    fig, ax = plt.subplots(figsize=job.get('figsize', (10, 6)))
+    for column in columns:
+        ax.plot(table[x], table[column], label=column)
+    ax.set_xlabel(job.get('xlabel', x))
+    ax.set_ylabel(job.get('ylabel', ''))
+    if 'title' in job:
+        ax.set_title(job['title'])
+    ax.legend()
+    fig.tight_layout()
+    output = context.path(job['output'])
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    fig.savefig(output, dpi=job.get('dpi', 100))
+    plt.close(fig)
+    return None
+
+JOB_TYPES = {
+    'cumulative_ed': job_cumulative_ed,
+    'ed_tensor': job_ed_tensor,
+    'emissions': job_emissions,
+    'degree_hour_report': job_degree_hour_report,
+    'degradation_curves': job_degradation_curves,
+    'degradation_uncertainty': job_degradation_uncertainty,
+    'exhibition_grid': job_exhibition_grid,
+    'exhibition_lifetime': job_exhibition_lifetime,
+    'schedule_optimization': job_schedule_optimization,
+    'daily_degradation': job_daily_degradation,
+    'plot': job_plot,
+}
+
+def load_spec(path):
+    with open(path) as f:
+        spec = json.load(f)
+    names = set()
+    for job in spec.get('jobs', []):
+        if job.get('type') not in JOB_TYPES:
+            raise ValueError(f"job {job.get('name')!r}: unknown type {job.get('type')!r}, expected one of {sorted(JOB_TYPES)}")
+        if 'name' not in job or job['name'] in names:
+            raise ValueError(f"every job needs a unique name (got {job.get('name')!r})")
+        names.add(job['name'])
+    return spec
+
+# Run the jobs of a spec in order and return {job name: result table}.
+# only restricts the run to the named jobs; a plot job whose source job is
+# left out fails with a KeyError.
+def run_spec(path, only=None, verbose=True):
+    spec = load_spec(path)
+    base_dir = os.path.dirname(os.path.abspath(path))
+    parameters = {}
+    if 'parameters_file' in spec:
+        from .calibration import load_parameters
+        parameters.update(load_parameters(os.path.join(base_dir, spec['parameters_file'])))
+    parameters.update(spec.get('parameters', {}))
+    context = Context(base_dir, parameters)
+    for job in spec.get('jobs', []):
+        if only and job['name'] not in only:
+            continue
+        start = time.perf_counter()
+        with span(job['name'], 'job', type=job['type']):
+            result = JOB_TYPES[job['type']](job, context)
+        context.results[job['name']] = result
+
+        if result is not None and 'output' in job:
+            output = context.path(job['output'])
+            os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+            result.to_csv(output, index=job['type'] == 'exhibition_grid')
+        if verbose:
+            print(f"[{job['name']}] {job['type']} finished in {time.perf_counter() - start:.2f} s"
+                  + (f" -> {job['output']}" if 'output' in job else ""))
+            if result is not None and 'output' not in job:
+                print(result.to_string(index=job['type'] == 'exhibition_grid'))
+    return context.results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m ctamodel', description='Run batches of ED and degradation jobs.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help='run the jobs of a JSON scenario spec')
+    run.add_argument('spec', help='path to the scenario spec')
+    run.add_argument('--only', nargs='+', metavar='NAME', help='run only the named jobs')
+    run.add_argument('--quiet', action='store_true', help='do not print progress or tables')
+    figures = commands.add_parser('figures', help='render the report figures without a display')
+    figures.add_argument('--output-dir', default='figures', help='directory for the figure files (default: figures)')
+    figures.add_argument('--formats', nargs='+', default=['png'], choices=['png', 'svg', 'pdf'], help='file formats')
+    figures.add_argument('--only', nargs='+', metavar='NAME', help='render only the named figures')
+    figures.add_argument('--workers', type=int, help='worker processes (default: one per core)')
+    figures.add_argument('--max-points', type=int, default=2000, help='points per line after downsampling')
+    figures.add_argument('--quiet', action='store_true', help='do not print progress')
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        try:
+            run_spec(args.spec, only=args.only, verbose=not args.quiet)
+        except (OSError, ValueError, KeyError) as error:
+            print(f"error: {error}", file=sys.stderr)
+            return 1
+    elif args.command == 'figures':
+        from .figures import render_report
+
+        start = time.perf_counter()
+        try:
+            paths = render_report(args.output_dir, names=args.only, formats=args.formats, max_points=args.max_points,
+                                  workers=args.workers, verbose=not args.quiet)
+        except (OSError, ValueError, KeyError) as error:
+            print(f"error: {error}", file=sys.stderr)
+            return 1
+        if not args.quiet:
+            for name, files in paths.items():
+                print(f"{name}: {', '.join(files)}")
+            print(f"{len(paths)} figures in {time.perf_counter() - start:.2f} s")
+    return 0
@@ -0,0 +1,122 @@
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from .profiling import span
+
+# Typed columns stored in the binary cache (temperatures in °C)
+COLUMNS = {
+    'year': np.int16,
+    'month': np.int16,
+    'day': np.int16,
+    'Tmin[C]': np.float32,
+    'Tmax[C]': np.float32,
+    'Tavg[C]': np.float32,
+}
+
+CACHE_DIR_NAME = '.climate_cache'
+
+# SHA-256 of the source file, read in blocks
+def file_hash(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+RAW_COLUMNS = ['datetime', 'year', 'month', 'day', 'Tmin[K]', 'Tmax[K]']
+
+def _read_climate_csv(path, **kwargs):
+    return pd.read_csv(
+        path, sep=';', encoding='utf-8-sig', decimal=',', header=0,
+        names=RAW_COLUMNS, **kwargs,
+    )
+
+# Convert a raw frame (or chunk) into the typed cache columns, dropping blank
+# ';;;;;' rows
+def _typed_columns(df):
+    df = df.dropna(subset=['year', 'Tmin[K]', 'Tmax[K]'])
+
+    Tmin = df['Tmin[K]'].to_numpy(dtype=float) - 273.15
+    Tmax = df['Tmax[K]'].to_numpy(dtype=float) - 273.15
+    columns = {
+        'year': df['year'].to_numpy(),
+        'month': df['month'].to_numpy(),
+        'day': df['day'].to_numpy(),
+        'Tmin[C]': Tmin,
+        'Tmax[C]': Tmax,
+        'Tavg[C]': (Tmin + Tmax) / 2,
+    }
+    return {name: np.ascontiguousarray(columns[name], dtype=dtype) for name, dtype in COLUMNS.items()}
+
+# Parse one of the semicolon-delimited SSP climate files into typed arrays.
+# Handles the BOM, comma decimals and blank ';;;;;' rows in a single read.
+def parse_climate_csv(path):
+    return _typed_columns(_read_climate_csv(path))
+
+# Read a climate file in bounded chunks of at most chunksize rows, yielding the
+# same typed columns as parse_climate_csv for each chunk
+def iter_climate_chunks(path, chunksize=100_000):
+    with _read_climate_csv(path, chunksize=chunksize) as reader:
+        for chunk in reader:
+            columns = _typed_columns(chunk)
+            if len(columns['year']):
+                yield columns
+
+def _cache_root(path, cache_dir):
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR_NAME)
+    return cache_dir
+
+def _write_cache(entry_dir, columns):
+    parent = os.path.dirname(entry_dir)
+    os.makedirs(parent, exist_ok=True)
+    # Write into a scratch directory first so a crashed run never leaves a
+    # half-written entry behind under the final name
+    scratch = tempfile.mkdtemp(dir=parent)
+    try:
+        for name, values in columns.items():
+            np.save(os.path.join(scratch, name + '.npy'), values)
+        os.replace(scratch, entry_dir)
+    except OSError:
+        shutil.rmtree(scratch, ignore_errors=True)
+        if not os.path.isdir(entry_dir):
+            raise
+
+# Remove cache entries built from older versions of the same CSV
+def _drop_stale_entries(cache_root, stem, keep):
+    for entry in os.listdir(cache_root):
+        if entry.startswith(stem + '-') and entry != keep:
+            shutil.rmtree(os.path.join(cache_root, entry), ignore_errors=True)
+
+# Load a climate file as a dict of typed column arrays. The first call parses
+# the CSV and writes a binary cache keyed by the file's hash; later calls
+# memory-map the cached arrays. Editing the CSV changes the hash, so the
+# cache is rebuilt automatically.
+def load_climate(path, cache_dir=None, mmap_mode='r'):
+    cache_root = _cache_root(path, cache_dir)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    key = f'{stem}-{file_hash(path)[:16]}'
+    entry_dir = os.path.join(cache_root, key)
+
+    with span('load_climate', 'io', path=os.path.basename(path), cache='hit' if os.path.isdir(entry_dir) else 'miss'):
+        if not os.path.isdir(entry_dir):
+            with span('parse_climate_csv', 'io', path=os.path.basename(path)):
+                columns = parse_climate_csv(path)
+            _write_cache(entry_dir, columns)
+            _drop_stale_entries(cache_root, stem, key)
+
+        return {name: np.load(os.path.join(entry_dir, name + '.npy'), mmap_mode=mmap_mode) for name in COLUMNS}
+
+# DataFrame view of a climate file for the ED scripts, with temperatures
+# widened back to float64 so downstream sums keep double precision
+def load_climate_frame(path, cache_dir=None):
+    columns = load_climate(path, cache_dir)
+    return pd.DataFrame({
+        name: values.astype(float) if values.dtype.kind == 'f' else np.asarray(values)
+        for name, values in columns.items()
+    })
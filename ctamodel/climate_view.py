@@ -0,0 +1,153 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from .degree_days import calculate_cdd_matrix
+from .energy_demand import calculate_sh_method1
+from .time_index import SegmentTotals, TimeIndex
+
+# Lazy view of a climate series with derived columns. Base columns are the
+# typed arrays of load_climate (memory-mapped from the binary cache); derived
+# fields such as SH for an RH or CDD for a base temperature are expressions
+# over base columns or other fields, and are only evaluated when an
+# aggregate asks for them:
+#
+#   view = ClimateView(load_climate(path))
+#   view.define_cdd({"Good": 2, "Average": 7, "Bad": 15})
+#   view.define_sh({"Good": 0.30, "Average": 0.50, "Bad": 0.70})
+#   totals = view.reduce(['CDD_Good', 'SH_Good'])   # SegmentTotals
+#   totals.annual(), totals.annual('mean')
+#
+# A reduction walks the series in chunks of whole months (at most
+# chunk_rows rows, or one month if longer), evaluates the fields it needs
+# for that chunk only and folds them into per-month sums, so resident memory
+# is set by the chunk size, not by the number of RH or T_base scenarios.
+#
+# With cache_bytes > 0 evaluated fields are also kept in full, least
+# recently used first out, within that budget; later reductions read them
+# instead of recomputing. A field is defined together with the other
+# columns its expression returns (one call to calculate_cdd_matrix gives
+# every base temperature), and is cached as that group.
+
+DEFAULT_CHUNK_ROWS = 1 << 12
+
+class ClimateView:
+    def __init__(self, climate, index=None, chunk_rows=DEFAULT_CHUNK_ROWS, cache_bytes=0):
+        self.base = climate
+        self.index = TimeIndex.from_climate(climate) if index is None else index
+        self.chunk_rows = chunk_rows
+        self.cache_bytes = cache_bytes
+        # name -> (group, column); group -> (names, func, inputs)
+        self._fields = {}
+        self._groups = []
+        self._cache = OrderedDict()
+
+    # Define one field, or several computed together, as func(*inputs) where
+    # inputs name base columns or earlier fields. func gets 1-D float64
+    # arrays and returns one value per row (one column per name).
+    def define(self, names, func, *inputs):
+        names = [names] if isinstance(names, str) else list(names)
+        taken = [name for name in names if name in self._fields or name in self.base]
+        if taken:
+            raise ValueError(f"columns already defined: {taken}")
+        unknown = [name for name in inputs if name not in self._fields and name not in self.base]
+        if unknown:
+            raise KeyError(f"unknown inputs {unknown}")
+        group = len(self._groups)
+        self._groups.append((names, func, inputs))
+        for column, name in enumerate(names):
+            self._fields[name] = (group, column)
+        return self
+
+    # SH_<scenario> for each RH of RH_values
+    def define_sh(self, RH_values, prefix='SH_'):
+        RHs = np.array(list(RH_values.values()), dtype=float)
+        return self.define([f'{prefix}{scenario}' for scenario in RH_values],
+                           lambda Tavg: calculate_sh_method1(Tavg[:, np.newaxis], RHs[np.newaxis, :]), 'Tavg[C]')
+
+    # CDD_<scenario> for each base temperature of T_base_values
+    def define_cdd(self, T_base_values, prefix='CDD_'):
+        T_bases = list(T_base_values.values())
+        return self.define([f'{prefix}{scenario}' for scenario in T_base_values],
+                           lambda Tmin, Tmax, Tavg: calculate_cdd_matrix(Tmin, Tmax, Tavg, T_bases),
+                           'Tmin[C]', 'Tmax[C]', 'Tavg[C]')
+
+    @property
+    def columns(self):
+        return list(self.base) + list(self._fields)
+
+    @property
+    def cached_bytes(self):
+        return sum(values.nbytes for values in self._cache.values())
+
+    # Row positions start..stop in index order: a slice of the base arrays,
+    # or a gather through the index's sort order for out-of-order files
+    def _rows(self, start, stop):
+        return slice(start, stop) if self.index.order is None else self.index.order[start:stop]
+
+    # Chunks of whole months: (first row, end row, first segment, end segment)
+    def _chunks(self):
+        starts = self.index.month_starts
+        bounds = np.append(starts, self.index.n_rows)
+        segment = 0
+        while segment < len(starts):
+            end = max(np.searchsorted(bounds, bounds[segment] + self.chunk_rows, side='right') - 1, segment + 1)
+            yield bounds[segment], bounds[end], segment, end
+            segment = end
+
+    # Values of a column for rows start..stop (index order); memo holds the
+    # groups already evaluated for this chunk
+    def _evaluate(self, name, start, stop, memo):
+        if name not in self._fields:
+            return np.asarray(self.base[name][self._rows(start, stop)], dtype=float)
+        group, column = self._fields[name]
+        if group not in memo:
+            cached = self._cache.get(group)
+            if cached is not None:
+                self._cache.move_to_end(group)
+                memo[group] = cached[start:stop]
+            else:
+                _, func, inputs = self._groups[group]
+                values = np.asarray(func(*(self._evaluate(source, start, stop, memo) for source in inputs)), dtype=float)
+                memo[group] = values.reshape(stop - start, -1)
+        return memo[group][:, column]
+
+    def _groups_of(self, names):
+        return sorted({self._fields[name][0] for name in names if name in self._fields})
+
+    def _store(self, buffers):
+        for group, values in buffers.items():
+            self._cache[group] = values
+        while self._cache and self.cached_bytes > self.cache_bytes:
+            self._cache.popitem(last=False)
+
+    # Per-month sums of the named columns, as a SegmentTotals
+    def reduce(self, names):
+        names = list(names)
+        unknown = [name for name in names if name not in self._fields and name not in self.base]
+        if unknown:
+            raise KeyError(f"unknown columns {unknown}")
+        buffers = {}
+        if self.cache_bytes:
+            for group in self._groups_of(names):
+                size = self.index.n_rows * len(self._groups[group][0]) * 8
+                if group not in self._cache and size <= self.cache_bytes:
+                    buffers[group] = np.empty((self.index.n_rows, len(self._groups[group][0])))
+
+        sums = np.empty((len(self.index.month_starts), len(names)))
+        for start, stop, first, end in self._chunks():
+            memo = {}
+            offsets = self.index.month_starts[first:end] - start
+            for j, name in enumerate(names):
+                sums[first:end, j] = np.add.reduceat(self._evaluate(name, start, stop, memo), offsets)
+            for group, values in buffers.items():
+                values[start:stop] = memo[group]
+        self._store(buffers)
+        return SegmentTotals(self.index, names, sums)
+
+    # Full column in the file's row order
+    def column(self, name):
+        values = np.empty(self.index.n_rows)
+        for start, stop, _, _ in self._chunks():
+            values[self._rows(start, stop)] = self._evaluate(name, start, stop, {})
+        return values
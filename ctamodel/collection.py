@@ -0,0 +1,227 @@
+from datetime import timedelta
+
+import numpy as np
+
+from . import degradation
+from .degradation import exposure_to_reach, hoac_after_exposure, rate_constant, season_of_month
+
+# Collection-scale degradation store. Per-object state lives in flat numpy
+# arrays (struct of arrays), one entry per film object:
+#
+#   HOAc0, ROAc0, H2O0   measured initial concentrations (float32, mol/m³)
+#   schedule             index of the object's home vault or exhibition
+#                        schedule (int32)
+#   exposure             ∫k dt accumulated since the store's start (float64)
+#
+# Schedules are shared: a vault holds a constant temperature and an
+# exhibition schedule repeats exhibition + cold storage cycles like
+# simulate_degradation. For every schedule the store keeps a cumulative
+# exposure table by day, so advancing the whole collection by any number of
+# days is one gather and one subtraction, whatever the number of objects.
+# Loans temporarily move an object to another schedule between two days.
+#
+# HOAc is only computed when asked for (one vectorized inversion), and
+# threshold queries never compute it at all: HOAc(t) >= N exactly when the
+# exposure reaches exposure_to_reach(HOAc0, N), so "objects above N by a
+# date" is a comparison of two arrays.
+
+# Schedule definitions (temperatures in K)
+def vault(temperature):
+    return {'type': 'vault', 'temperature': temperature}
+
+def exhibition_schedule(exhibition_days, cold_storage_months, season_temps, cold_storage_temp):
+    return {
+        'type': 'exhibition', 'exhibition_days': exhibition_days, 'cold_storage_months': cold_storage_months,
+        'season_temps': season_temps, 'cold_storage_temp': cold_storage_temp,
+    }
+
+# Daily temperatures (K) of a schedule for n_days starting at start_date.
+# An exhibition schedule uses the season at the start of each exhibition,
+# then one month of cold storage = 30 days, as in simulate_degradation.
+def schedule_temperatures(schedule, start_date, n_days):
+    if schedule['type'] == 'vault':
+        return np.full(n_days, float(schedule['temperature']))
+    if schedule['type'] != 'exhibition':
+        raise ValueError(f"unknown schedule type {schedule['type']!r}")
+
+    temperatures = np.empty(n_days)
+    exhibition_days = schedule['exhibition_days']
+    storage_days = schedule['cold_storage_months'] * 30
+    day = 0
+    while day < n_days:
+        date = start_date + timedelta(days=day)
+        temperatures[day:day + exhibition_days] = schedule['season_temps'][season_of_month(date.month)]
+        temperatures[day + exhibition_days:day + exhibition_days + storage_days] = schedule['cold_storage_temp']
+        day += exhibition_days + storage_days
+    return temperatures
+
+class CollectionStore:
+    # schedules maps a name to a schedule definition; the store covers the
+    # days from start_date (inclusive) to end_date (exclusive)
+    def __init__(self, schedules, start_date, end_date, A=degradation.A, Ea=degradation.Ea):
+        self.start_date = start_date
+        self.n_days = (end_date - start_date).days
+        self.schedule_names = list(schedules)
+        k = np.stack([rate_constant(schedule_temperatures(schedule, start_date, self.n_days), A, Ea)
+                      for schedule in schedules.values()])
+        # cumulative[s, d] = exposure of schedule s over days [0, d)
+        self.cumulative = np.concatenate([np.zeros((len(k), 1)), np.cumsum(k * 24 * 3600, axis=1)], axis=1)
+        self.day = 0
+
+        self.HOAc0 = np.empty(0, dtype=np.float32)
+        self.ROAc0 = np.empty(0, dtype=np.float32)
+        self.H2O0 = np.empty(0, dtype=np.float32)
+        self.schedule = np.empty(0, dtype=np.int32)
+        self.exposure = np.empty(0)
+
+        self.loan_object = np.empty(0, dtype=np.int64)
+        self.loan_schedule = np.empty(0, dtype=np.int32)
+        self.loan_start = np.empty(0, dtype=np.int64)
+        self.loan_end = np.empty(0, dtype=np.int64)
+        self._thresholds = {}
+
+    def __len__(self):
+        return len(self.HOAc0)
+
+    def day_of(self, date):
+        day = (date - self.start_date).days
+        if not 0 <= day <= self.n_days:
+            raise ValueError(f"{date} is outside the store's span")
+        return day
+
+    def schedule_index(self, names):
+        lookup = {name: i for i, name in enumerate(self.schedule_names)}
+        return np.array([lookup[name] for name in np.atleast_1d(names)], dtype=np.int32)
+
+    # Add objects with their initial concentrations and home schedule (a
+    # name, or one name per object). New objects start at the store's
+    # current day with zero exposure. Returns their indices.
+    def add_objects(self, HOAc0, schedule, ROAc0=degradation.ROAc0, H2O0=degradation.H2O0):
+        HOAc0 = np.atleast_1d(np.asarray(HOAc0, dtype=np.float32))
+        n = len(HOAc0)
+        ROAc0 = np.broadcast_to(np.asarray(ROAc0, dtype=np.float32), (n,))
+        H2O0 = np.broadcast_to(np.asarray(H2O0, dtype=np.float32), (n,))
+        if np.any(HOAc0 < 0) or np.any(HOAc0 > np.minimum(ROAc0, H2O0)):
+            raise ValueError("HOAc0 must lie in [0, min(ROAc0, H2O0)]")
+        if np.isscalar(schedule) or isinstance(schedule, str):
+            schedule = np.full(n, self.schedule_index(schedule)[0], dtype=np.int32)
+        else:
+            schedule = self.schedule_index(schedule)
+
+        first = len(self)
+        self.HOAc0 = np.concatenate([self.HOAc0, HOAc0])
+        self.ROAc0 = np.concatenate([self.ROAc0, ROAc0])
+        self.H2O0 = np.concatenate([self.H2O0, H2O0])
+        self.schedule = np.concatenate([self.schedule, schedule])
+        self.exposure = np.concatenate([self.exposure, np.zeros(n)])
+        self._thresholds = {}
+        return np.arange(first, first + n)
+
+    # Move objects to another schedule from start_date to end_date. An
+    # object is in one place at a time: a loan overlapping an earlier loan
+    # of the same object to the same schedule is merged with it into one
+    # stay, and one to a different schedule is rejected.
+    def add_loan(self, objects, schedule, start_date, end_date):
+        objects = np.atleast_1d(np.asarray(objects, dtype=np.int64))
+        start, end = self.day_of(start_date), self.day_of(end_date)
+        if end <= start:
+            raise ValueError("a loan must end after it starts")
+        if len(np.unique(objects)) != len(objects):
+            raise ValueError("an object is listed twice in the same loan")
+        away = self.schedule_index(schedule)[0]
+
+        overlapping = np.isin(self.loan_object, objects) & (self.loan_start < end) & (start < self.loan_end)
+        if np.any(self.loan_schedule[overlapping] != away):
+            raise ValueError("the loan overlaps a loan of the same object to another schedule")
+        starts = np.full(len(objects), start, dtype=np.int64)
+        ends = np.full(len(objects), end, dtype=np.int64)
+        row = {obj: i for i, obj in enumerate(objects.tolist())}
+        for loan in np.flatnonzero(overlapping):
+            i = row[int(self.loan_object[loan])]
+            starts[i] = min(starts[i], self.loan_start[loan])
+            ends[i] = max(ends[i], self.loan_end[loan])
+
+        keep = ~overlapping
+        self.loan_object = np.concatenate([self.loan_object[keep], objects])
+        self.loan_schedule = np.concatenate([self.loan_schedule[keep], np.full(len(objects), away, dtype=np.int32)])
+        self.loan_start = np.concatenate([self.loan_start[keep], starts])
+        self.loan_end = np.concatenate([self.loan_end[keep], ends])
+
+    # Exposure every object gains over days [first, last) on top of its
+    # current state, loans included
+    def _exposure_between(self, first, last):
+        gain = self.cumulative[self.schedule, last] - self.cumulative[self.schedule, first]
+        if len(self.loan_object):
+            a = np.clip(self.loan_start, first, last)
+            b = np.clip(self.loan_end, first, last)
+            active = b > a
+            objects = self.loan_object[active]
+            a, b = a[active], b[active]
+            home = self.schedule[objects]
+            away = self.loan_schedule[active]
+            np.add.at(gain, objects, (self.cumulative[away, b] - self.cumulative[away, a])
+                      - (self.cumulative[home, b] - self.cumulative[home, a]))
+        return gain
+
+    # Advance the whole collection to date
+    def advance_to(self, date):
+        day = self.day_of(date)
+        if day < self.day:
+            raise ValueError("the store cannot go back in time")
+        self.exposure += self._exposure_between(self.day, day)
+        self.day = day
+
+    def advance(self, days):
+        self.advance_to(self.start_date + timedelta(days=self.day + days))
+
+    @property
+    def date(self):
+        return self.start_date + timedelta(days=self.day)
+
+    # Exposure of every object at date (projected forward from the current
+    # day without changing the store)
+    def exposure_at(self, date):
+        day = self.day_of(date)
+        if day < self.day:
+            raise ValueError("the store only projects forward from its current day")
+        return self.exposure + self._exposure_between(self.day, day)
+
+    # HOAc (mol/m³) of every object at date, or now
+    def hoac(self, date=None):
+        exposure = self.exposure if date is None else self.exposure_at(date)
+        return hoac_after_exposure(self.HOAc0, exposure, self.ROAc0, self.H2O0)
+
+    # Indices of objects whose HOAc has reached threshold at date (or now),
+    # decided in exposure space without inverting the rate law
+    def above(self, threshold, date=None):
+        exposure = self.exposure if date is None else self.exposure_at(date)
+        return np.flatnonzero(exposure >= self.threshold_exposure(threshold))
+
+    def count_above(self, threshold, date=None):
+        return len(self.above(threshold, date))
+
+    # Exposure each object needs to reach threshold; cached per threshold
+    # since it only depends on the initial concentrations
+    def threshold_exposure(self, threshold):
+        threshold = float(threshold)
+        if threshold not in self._thresholds:
+            self._thresholds[threshold] = exposure_to_reach(self.HOAc0, threshold, self.ROAc0, self.H2O0)
+        return self._thresholds[threshold]
+
+    # Save the per-object arrays (not the schedules) to a .npz file
+    def save(self, path):
+        np.savez(
+            path, day=self.day, HOAc0=self.HOAc0, ROAc0=self.ROAc0, H2O0=self.H2O0, schedule=self.schedule,
+            exposure=self.exposure, loan_object=self.loan_object, loan_schedule=self.loan_schedule,
+            loan_start=self.loan_start, loan_end=self.loan_end,
+        )
+
+    # Restore arrays written by save into a store built with the same
+    # schedules and span
+    def load(self, path):
+        with np.load(path) as data:
+            self.day = int(data['day'])
+            for name in ('HOAc0', 'ROAc0', 'H2O0', 'schedule', 'exposure',
+                         'loan_object', 'loan_schedule', 'loan_start', 'loan_end'):
+                setattr(self, name, data[name])
+        self._thresholds = {}
@@ -0,0 +1,286 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+# Constants
+R = 8.314  # Ideal gas constant (J/(mol·K))
+A = 0.00103  # Pre-exponential factor (mol^-2 m^6 s^-1)
+Ea = 70734  # Activation energy (J/mol)
+ROAc0 = 13403.6  # Initial acetyl concentration (mol/m³)
+H2O0 = 2137.2  # Initial water concentration (mol/m³)
+HOAc0 = 52  # Initial acetic acid concentration (mol/m³)
+
+# Define the rate constant
+def rate_constant(T, A=A, Ea=Ea):
+    return A * np.exp(-Ea / (R * T))
+
+# Differential equation for acetic acid concentration
+def acetic_acid_concentration(t, HOAc, k, ROAc0=ROAc0, H2O0=H2O0):
+    ROAc = ROAc0 - HOAc
+    H2O = H2O0 - HOAc
+    dHOAc_dt = k * ROAc * H2O * HOAc
+    return dHOAc_dt
+
+# The rate law dHOAc/dt = k·(ROAc0 - HOAc)·(H2O0 - HOAc)·HOAc is separable.
+# With m = min(ROAc0, H2O0) and M = max(ROAc0, H2O0), partial fractions give
+#
+#   G(HOAc) = ln HOAc + m/(M-m)·ln(M - HOAc) - M/(M-m)·ln(m - HOAc)
+#   G(HOAc(t1)) = G(HOAc(t0)) + m·M·∫k dt
+#
+# so a phase only needs its exposure ∫k dt. G is evaluated in terms of the
+# logit s = ln(HOAc / (m - HOAc)), which stays well conditioned as HOAc
+# approaches m, and dG/ds = M/(M - HOAc) lies between 1 and M/(M-m).
+def _bounds(ROAc0, H2O0):
+    ROAc0 = np.asarray(ROAc0, dtype=float)
+    H2O0 = np.asarray(H2O0, dtype=float)
+    if np.any(ROAc0 == H2O0):
+        raise ValueError("the analytic propagator needs ROAc0 != H2O0; use method='RK45'")
+    return np.minimum(ROAc0, H2O0), np.maximum(ROAc0, H2O0)
+
+# G(s) and HOAc(s). The coefficients c_m = m/(M-m) and c_M = M/(M-m) are
+# passed in so a Newton loop over a large batch computes them only once.
+def _potential(s, m, M, c_m, c_M):
+    HOAc = m / (1 + np.exp(-s))
+    log_HOAc = np.log(HOAc)
+    log_free = log_HOAc - s  # ln(m - HOAc)
+    return log_HOAc + c_m * np.log(M - HOAc) - c_M * log_free, HOAc
+
+# Advance HOAc by a given exposure ∫k dt (m^6 mol^-2) in O(1): a handful of
+# Newton iterations on G, whatever the length of the interval. All arguments
+# broadcast, so whole batches of states advance in one call.
+def hoac_after_exposure(HOAc, exposure, ROAc0=ROAc0, H2O0=H2O0, tol=1e-14, max_iter=100):
+    m, M = _bounds(ROAc0, H2O0)
+    HOAc, exposure, m, M = np.broadcast_arrays(
+        np.asarray(HOAc, dtype=float), np.asarray(exposure, dtype=float), m, M)
+    if np.any(HOAc < 0) or np.any(HOAc > m):
+        raise ValueError("HOAc must lie in [0, min(ROAc0, H2O0)]")
+
+    # HOAc = 0 and HOAc = min(ROAc0, H2O0) are fixed points of the rate law
+    active = (HOAc > 0) & (HOAc < m)
+    with np.errstate(divide='ignore'):
+        s = np.log(HOAc) - np.log(m - HOAc)
+    s = np.where(active, s, 0.0)
+    c_m = m / (M - m)
+    c_M = M / (M - m)
+    target, _ = _potential(s, m, M, c_m, c_M)
+    target = target + m * M * exposure
+
+    # G is convex and increasing in s, so after the first step Newton
+    # approaches the root from above without overshooting
+    s = s + m * M * exposure * (M - HOAc) / M
+    for _ in range(max_iter):
+        G, HOAc_s = _potential(s, m, M, c_m, c_M)
+        step = (G - target) * (M - HOAc_s) / M
+        s = s - step
+        if np.all(np.abs(step) <= tol * (1 + np.abs(s))):
+            break
+
+    result = m / (1 + np.exp(-s))
+    result = np.where(active & (exposure != 0), result, HOAc)
+    return result if result.ndim else float(result)
+
+# Inverse of hoac_after_exposure: the exposure ∫k dt (m^6 mol^-2) that takes
+# HOAc to target, in closed form as (G(target) - G(HOAc)) / (m·M). Zero if
+# target <= HOAc and infinite if target is never reached (target >= m, or
+# HOAc = 0). Arguments broadcast.
+def exposure_to_reach(HOAc, target, ROAc0=ROAc0, H2O0=H2O0):
+    m, M = _bounds(ROAc0, H2O0)
+    HOAc, target, m, M = np.broadcast_arrays(
+        np.asarray(HOAc, dtype=float), np.asarray(target, dtype=float), m, M)
+    if np.any(HOAc < 0) or np.any(HOAc > m):
+        raise ValueError("HOAc must lie in [0, min(ROAc0, H2O0)]")
+
+    finite = (target > HOAc) & (target < m) & (HOAc > 0)
+    c_m = m / (M - m)
+    c_M = M / (M - m)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s_start = np.log(HOAc) - np.log(m - HOAc)
+        s_target = np.log(target) - np.log(m - target)
+    G_start, _ = _potential(np.where(finite, s_start, 0.0), m, M, c_m, c_M)
+    G_target, _ = _potential(np.where(finite, s_target, 0.0), m, M, c_m, c_M)
+    exposure = np.where(finite, (G_target - G_start) / (m * M), np.where(target <= HOAc, 0.0, np.inf))
+    return exposure if exposure.ndim else float(exposure)
+
+# Analytic propagator: HOAc after `duration` seconds at constant k
+def propagate_hoac(HOAc, k, duration, ROAc0=ROAc0, H2O0=H2O0):
+    return hoac_after_exposure(HOAc, np.multiply(k, duration), ROAc0, H2O0)
+
+# Drop-in replacement for one solve_ivp phase: advance HOAc over `duration`
+# seconds at constant k. method='analytic' uses the exact propagator,
+# method='table' a cached interpolation table of the phase (phase_operators);
+# any solve_ivp method name (e.g. 'RK45') falls back to the numerical solver,
+# with extra keyword arguments such as max_step passed through.
+def advance_hoac(HOAc, k, duration, ROAc0=ROAc0, H2O0=H2O0, method='analytic', **solver_kwargs):
+    if method == 'analytic':
+        return propagate_hoac(HOAc, k, duration, ROAc0, H2O0)
+    if method == 'table':
+        from .phase_operators import phase_operator
+        return phase_operator(k, duration, ROAc0, H2O0)(HOAc)
+
+    from .profiling import solve_ivp
+    solution = solve_ivp(
+        acetic_acid_concentration, [0, duration], np.atleast_1d(HOAc),
+        args=(k, ROAc0, H2O0), method=method, **solver_kwargs
+    )
+    return solution.y[0][-1] if np.ndim(HOAc) == 0 else solution.y[:, -1]
+
+# HOAc at each time in t_eval (seconds, starting at t_eval[0]) for constant k,
+# the same values solve_ivp(..., t_eval=t_eval).y[0] returns
+def hoac_trajectory(k, t_eval, HOAc0=HOAc0, ROAc0=ROAc0, H2O0=H2O0, method='analytic', **solver_kwargs):
+    t_eval = np.asarray(t_eval, dtype=float)
+    if method == 'analytic':
+        return hoac_after_exposure(HOAc0, k * (t_eval - t_eval[0]), ROAc0, H2O0)
+
+    from .profiling import solve_ivp
+    solution = solve_ivp(
+        acetic_acid_concentration, (t_eval[0], t_eval[-1]), [HOAc0],
+        args=(k, ROAc0, H2O0), method=method, t_eval=t_eval, **solver_kwargs
+    )
+    return solution.y[0]
+
+# Determine the season based on the month
+def season_of_month(month):
+    if month in [12, 1, 2]:
+        return "winter"
+    elif month in [6, 7, 8]:
+        return "summer"
+    else:
+        return "spring/autumn"
+
+def get_season(date):
+    return season_of_month(date.month)
+
+# Simulate one exhibition/cold-storage cycle calendar: each cycle starts with
+# an exhibition at the temperature of the current season, followed by cold
+# storage (one month = 30 days), until end_date is reached
+def simulate_degradation(exhibition_days, cold_storage_months, start_date, end_date, season_temps, cold_storage_temp,
+                         HOAc0=HOAc0, ROAc0=ROAc0, H2O0=H2O0, A=A, Ea=Ea, method='analytic'):
+    date = start_date
+    HOAc = HOAc0
+    while date < end_date:
+        # Exhibition phase
+        k_exhibition = rate_constant(season_temps[get_season(date)], A, Ea)
+        exhibition_duration = exhibition_days * 24 * 3600  # Convert days to seconds
+        HOAc = advance_hoac(HOAc, k_exhibition, exhibition_duration, ROAc0, H2O0, method=method, max_step=1e5)
+        date += timedelta(days=exhibition_days)
+
+        # Cold storage phase
+        k_cold_storage = rate_constant(cold_storage_temp, A, Ea)
+        storage_duration = cold_storage_months * 30 * 24 * 3600  # Convert months to seconds
+        HOAc = advance_hoac(HOAc, k_cold_storage, storage_duration, ROAc0, H2O0, method=method, max_step=1e5)
+        date += timedelta(days=cold_storage_months * 30)
+    return HOAc
+
+# Advance a batch of cells, each with its own k and duration, through one
+# phase with a numerical solver. Time is rescaled to tau in [0, 1] so every
+# cell shares the same integration interval.
+def _advance_batch_numerical(HOAc, exposure, ROAc0, H2O0, method, **solver_kwargs):
+    from .profiling import solve_ivp
+
+    def rhs(tau, HOAc):
+        return acetic_acid_concentration(tau, HOAc, exposure, ROAc0, H2O0)
+
+    solution = solve_ivp(rhs, [0, 1], HOAc, method=method, **solver_kwargs)
+    return solution.y[:, -1]
+
+# Batched version of simulate_degradation for a whole grid of calendars.
+# Every (cold_storage_months, exhibition_days) cell is one entry of a state
+# vector and all cells advance in lock-step, one exhibition + storage cycle
+# per iteration. Cells whose calendars pass end_date drop out of the active
+# set while the others keep going, and only the final HOAc is kept.
+#
+# With method='analytic' the cells only accumulate their exposure ∫k dt and
+# HOAc is recovered once at the end; method='table' applies the cached
+# operator of each distinct phase, and any solve_ivp method name integrates
+# each phase numerically for all active cells at once. Returns a
+# (len(cold_storage_lengths), len(exhibition_lengths)) matrix.
+def simulate_degradation_grid(exhibition_lengths, cold_storage_lengths, start_date, end_date, season_temps,
+                              cold_storage_temp, HOAc0=HOAc0, ROAc0=ROAc0, H2O0=H2O0, A=A, Ea=Ea,
+                              method='analytic', **solver_kwargs):
+    cold_months, exhibition_days = np.meshgrid(cold_storage_lengths, exhibition_lengths, indexing='ij')
+    exhibition_days = exhibition_days.ravel().astype(np.int64)
+    storage_days = cold_months.ravel().astype(np.int64) * 30
+
+    # Exhibition rate constant for each calendar month (index 0 = January)
+    k_by_month = np.array([rate_constant(season_temps[season_of_month(month)], A, Ea) for month in range(1, 13)])
+    k_cold_storage = rate_constant(cold_storage_temp, A, Ea)
+
+    start = np.datetime64(start_date, 'D')
+    end = np.datetime64(end_date, 'D')
+    date = np.full(exhibition_days.shape, start)
+    exposure = np.zeros(exhibition_days.shape)
+    HOAc = np.full(exhibition_days.shape, float(HOAc0))
+
+    active = np.flatnonzero(date < end)
+    while active.size:
+        month = date[active].astype('datetime64[M]').astype(np.int64) % 12
+        phases = [
+            (k_by_month[month] * exhibition_days[active] * 24 * 3600, exhibition_days[active]),
+            (k_cold_storage * storage_days[active] * 24 * 3600, storage_days[active]),
+        ]
+        for phase_exposure, phase_days in phases:
+            if method == 'analytic':
+                exposure[active] += phase_exposure
+            elif method == 'table':
+                from .phase_operators import advance_batch
+                HOAc[active] = advance_batch(HOAc[active], phase_exposure, ROAc0, H2O0)
+            else:
+                HOAc[active] = _advance_batch_numerical(HOAc[active], phase_exposure, ROAc0, H2O0, method, **solver_kwargs)
+            date[active] += phase_days
+        active = active[date[active] < end]
+
+    if method == 'analytic':
+        HOAc = hoac_after_exposure(HOAc0, exposure, ROAc0, H2O0)
+    return HOAc.reshape(len(cold_storage_lengths), len(exhibition_lengths))
+
+# Indoor temperature (°C) for a storage scenario: T_base is the cooling
+# setpoint, so warmer days are held at T_base and colder days follow the
+# outdoor daily mean. T_base=None means no cooling (outdoor temperature).
+def indoor_temperature(Tavg, T_base=None):
+    Tavg = np.asarray(Tavg, dtype=float)
+    return Tavg if T_base is None else np.minimum(Tavg, T_base)
+
+# Daily rate constants and cumulative exposure of one climate series, one
+# column per scenario of T_base_values. Rows are put in date order and
+# repeated dates keep their first row; each day's rate then holds until the
+# next available date, which also bridges gaps in the series. Returns
+# (dates, k, exposure) with exposure the cumulative ∫k dt at the end of each
+# day.
+def daily_exposure(climate, T_base_values, A=A, Ea=Ea):
+    dates = pd.to_datetime(pd.DataFrame({
+        'year': np.asarray(climate['year']),
+        'month': np.asarray(climate['month']),
+        'day': np.asarray(climate['day']),
+    }))
+    order = np.argsort(dates.to_numpy(), kind='stable')
+    dates = dates.to_numpy()[order]
+    first = np.concatenate([[True], dates[1:] != dates[:-1]])
+    rows, dates = order[first], dates[first]
+
+    # Seconds until the next available date; the last day counts once
+    dt = np.diff(dates).astype('timedelta64[s]').astype(float)
+    dt = np.append(dt, 24 * 3600.0)
+
+    Tavg = np.asarray(climate['Tavg[C]'], dtype=float)[rows]
+    T_indoor = np.column_stack([indoor_temperature(Tavg, T_base) for T_base in T_base_values.values()])
+    k = rate_constant(T_indoor + 273.15, A, Ea)
+    return dates, k, np.cumsum(k * dt[:, np.newaxis], axis=0)
+
+# Degradation driven by a daily climate series. k(T) is piecewise constant
+# per day, so each day adds k(T_day)·Δt to the exposure and the whole
+# trajectory follows from one cumulative sum and one vectorized inversion:
+# no per-day solver calls, however long the series.
+#
+# climates maps a site name to its typed climate columns (load_climate) and
+# T_base_values maps a scenario name to its setpoint in °C, e.g.
+# {"Good": 2, "Average": 7, "Bad": 15} (RH does not enter the rate law).
+# Returns {site: DataFrame} of HOAc (mol/m³) at the end of each day (see
+# daily_exposure), indexed by date with one column per scenario.
+def simulate_daily_climate(climates, T_base_values, HOAc0=HOAc0, ROAc0=ROAc0, H2O0=H2O0, A=A, Ea=Ea):
+    results = {}
+    for site, climate in climates.items():
+        dates, _, exposure = daily_exposure(climate, T_base_values, A, Ea)
+        HOAc = hoac_after_exposure(HOAc0, exposure, ROAc0, H2O0)
+        results[site] = pd.DataFrame(HOAc, index=pd.DatetimeIndex(dates, name='date'), columns=list(T_base_values))
+    return results
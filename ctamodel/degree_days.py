@@ -0,0 +1,94 @@
+import numpy as np
+
+# Francesca's four-case CDD formula applied to whole arrays at once.
+# Tmin, Tmax and Tavg are daily series in °C; T_bases is a list of base
+# temperatures. Returns a (days x bases) matrix, one column per base.
+def calculate_cdd_matrix(Tmin, Tmax, Tavg, T_bases):
+    Tmin = np.asarray(Tmin, dtype=float)[:, np.newaxis]
+    Tmax = np.asarray(Tmax, dtype=float)[:, np.newaxis]
+    Tavg = np.asarray(Tavg, dtype=float)[:, np.newaxis]
+    T_base = np.asarray(T_bases, dtype=float)[np.newaxis, :]
+
+    # Same branch order as the per-row loop: the first matching case wins,
+    # and a day matching none of them (e.g. a blank row read as NaN) stays 0
+    conditions = [
+        Tmax <= T_base,
+        (Tavg <= T_base) & (T_base < Tmax),
+        (Tmin < T_base) & (T_base < Tavg),
+        Tmin >= T_base,
+    ]
+    choices = [
+        0.0,
+        (Tmax - T_base) / 4,
+        ((Tmax - T_base) / 2) - ((T_base - Tmin) / 4),
+        Tavg - T_base,
+    ]
+    return np.select(conditions, choices, default=0.0)
+
+# Function to calculate the CDD for a single base temperature
+def calculate_cdd(df, T_base):
+    return calculate_cdd_matrix(df['Tmin[C]'], df['Tmax[C]'], df['Tavg[C]'], [T_base])[:, 0]
+
+# Francesca's formula is continuous and piecewise linear in T_base, so a
+# year's CDD at any base b splits into sums over the days whose Tmax, Tavg
+# or Tmin lies above b (ties do not matter, the cases agree there):
+#
+#   CDD(b) = 1/4·Σ_{Tmax>b} (Tmax - b) - 1/4·Σ_{Tavg>b} (Tmax - b)
+#          + Σ_{Tavg>b} (P - 3b/4) - Σ_{Tmin>b} (P - 3b/4)
+#          + Σ_{Tmin>b} (Tavg - b)
+#
+# with P = Tmax/2 + Tmin/4. Sorting each year's days by Tmax, Tavg and Tmin
+# once, with prefix sums of the weights, turns every such sum into a binary
+# search and a subtraction, so the annual CDD for thousands of base
+# temperatures costs no more passes over the data than for one.
+#
+# The index keeps, per key, the keys sorted within each year (years follow
+# each other, 'offsets' marks where each starts) and the running totals of
+# the weights in the same order. Days with a missing temperature count 0,
+# as in calculate_cdd_matrix.
+def build_cdd_index(year, Tmin, Tmax, Tavg):
+    year = np.asarray(year)
+    Tmin = np.asarray(Tmin, dtype=float)
+    Tmax = np.asarray(Tmax, dtype=float)
+    Tavg = np.asarray(Tavg, dtype=float)
+    years, inverse = np.unique(year, return_inverse=True)
+    valid = ~(np.isnan(Tmin) | np.isnan(Tmax) | np.isnan(Tavg))
+    inverse, Tmin, Tmax, Tavg = inverse[valid], Tmin[valid], Tmax[valid], Tavg[valid]
+    P = Tmax / 2 + Tmin / 4
+
+    def sorted_by(key, *weights):
+        order = np.lexsort((key, inverse))
+        return key[order], [np.concatenate([[0.0], np.cumsum(weight[order])]) for weight in weights]
+
+    return {
+        'years': years,
+        'offsets': np.concatenate([[0], np.cumsum(np.bincount(inverse, minlength=len(years)))]),
+        'Tmax': sorted_by(Tmax, Tmax),
+        'Tavg': sorted_by(Tavg, Tmax, P),
+        'Tmin': sorted_by(Tmin, P, Tavg),
+    }
+
+# Annual CDD for every base temperature of T_bases, as a
+# (len(index['years']) x len(T_bases)) matrix, the same numbers as summing
+# calculate_cdd_matrix by year
+def annual_cdd(index, T_bases):
+    b = np.asarray(T_bases, dtype=float).ravel()
+    offsets = index['offsets']
+    CDD = np.empty((len(index['years']), len(b)))
+    for i in range(len(index['years'])):
+        start, end = offsets[i], offsets[i + 1]
+
+        # Number of the year's days with key > b and the sums of the weights
+        # over them
+        def above(name):
+            keys, totals = index[name]
+            position = start + np.searchsorted(keys[start:end], b, side='right')
+            return end - position, [total[end] - total[position] for total in totals]
+
+        n_max, (Tmax_max,) = above('Tmax')
+        n_avg, (Tmax_avg, P_avg) = above('Tavg')
+        n_min, (P_min, Tavg_min) = above('Tmin')
+        CDD[i] = (((Tmax_max - n_max * b) - (Tmax_avg - n_avg * b)) / 4
+                  + (P_avg - 0.75 * b * n_avg) - (P_min - 0.75 * b * n_min)
+                  + (Tavg_min - n_min * b))
+    return CDD
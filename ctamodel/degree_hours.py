@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+from .degree_days import calculate_cdd_matrix
+from .energy_demand import A_over_V, calculate_ed
+
+# Degree-hour cooling model. Each day's hourly temperatures follow a
+# sinusoid between Tmin and Tmax peaking at peak_hour,
+#
+#   T(h) = Tavg + (Tmax - Tmin)/2 · cos(2π (h + 0.5 - peak_hour) / 24)
+#
+# sampled at the middle of each hour, and the cooling load is the sum of
+# max(T(h) - T_base, 0) over the 24 hours (K·h). Days are processed in
+# chunks through preallocated float32 buffers, so memory is bounded by
+# chunk_days whatever the length of the series; per-day totals are summed
+# in float64.
+
+HOURS = np.arange(24, dtype=np.float32)
+
+def _hour_weights(peak_hour):
+    return np.cos(2 * np.pi * (HOURS + np.float32(0.5) - np.float32(peak_hour)) / 24).astype(np.float32)
+
+# Hourly temperature profile (days x 24, float32) of daily Tmin/Tmax
+def diurnal_profile(Tmin, Tmax, peak_hour=15):
+    Tmin = np.asarray(Tmin, dtype=np.float32)
+    Tmax = np.asarray(Tmax, dtype=np.float32)
+    return (Tmin + Tmax)[:, np.newaxis] / 2 + (Tmax - Tmin)[:, np.newaxis] / 2 * _hour_weights(peak_hour)
+
+# Daily cooling degree-hours (days x bases, K·h) in chunks of chunk_days
+def daily_degree_hours(Tmin, Tmax, T_bases, chunk_days=4096, peak_hour=15):
+    T_bases = np.asarray(T_bases, dtype=np.float32)
+    weights = _hour_weights(peak_hour)
+    n = len(Tmin)
+    DH = np.empty((n, len(T_bases)))
+    hourly = np.empty((chunk_days, 24), dtype=np.float32)
+    excess = np.empty((chunk_days, 24), dtype=np.float32)
+    for start in range(0, n, chunk_days):
+        stop = min(start + chunk_days, n)
+        size = stop - start
+        Tmin_chunk = np.asarray(Tmin[start:stop], dtype=np.float32)
+        Tmax_chunk = np.asarray(Tmax[start:stop], dtype=np.float32)
+        T, E = hourly[:size], excess[:size]
+        np.multiply(((Tmax_chunk - Tmin_chunk) / 2)[:, np.newaxis], weights, out=T)
+        T += ((Tmin_chunk + Tmax_chunk) / 2)[:, np.newaxis]
+        for j, T_base in enumerate(T_bases):
+            np.subtract(T, T_base, out=E)
+            np.maximum(E, 0, out=E)
+            DH[start:stop, j] = E.sum(axis=1, dtype=np.float64)
+    return DH
+
+# Annual cooling degree-hours of a climate (typed columns from
+# load_climate): returns (years, years x bases array). Only one chunk of
+# days is ever materialized, so memory-mapped climate arrays stay on disk.
+def annual_degree_hours(climate, T_bases, chunk_days=4096, peak_hour=15):
+    year = np.asarray(climate['year'])
+    years, inverse = np.unique(year, return_inverse=True)
+    totals = np.zeros((len(years), len(T_bases)))
+    for start in range(0, len(year), chunk_days):
+        stop = min(start + chunk_days, len(year))
+        DH = daily_degree_hours(climate['Tmin[C]'][start:stop], climate['Tmax[C]'][start:stop], T_bases,
+                                chunk_days=chunk_days, peak_hour=peak_hour)
+        for j in range(len(T_bases)):
+            totals[:, j] += np.bincount(inverse[start:stop], weights=DH[:, j], minlength=len(years))
+    return years, totals
+
+# Thermal ED (kWh) from degree-hours: U·(A/V)·Σ max(T - T_base, 0) over hours
+def calculate_ed_degree_hours(DH, U_value):
+    return A_over_V * U_value * DH / 1000  # kWh
+
+# Year-by-year comparison of the degree-hour model with the daily four-case
+# CDD. climates maps a site to its typed columns, U_values a site to its
+# U-value and T_base_values a scenario to its setpoint. Returns one row per
+# (site, scenario, year) with
+#   CDD_daily   four-case CDD (calculate_cdd), °C·day
+#   CDD_hourly  degree-hours / 24, °C·day
+#   ED_daily    calculate_ed(CDD_daily), kWh
+#   ED_hourly   calculate_ed_degree_hours(degree-hours), kWh
+# calculate_ed multiplies annual degree-days by hours_per_year (8760) while
+# degree-hours count 24 h per degree-day, so ED_hourly/ED_daily combines the
+# difference in load shape (CDD_hourly/CDD_daily) with that factor of 365.
+def degree_hour_report(climates, U_values, T_base_values, chunk_days=4096, peak_hour=15):
+    T_bases = list(T_base_values.values())
+    frames = []
+    for site, climate in climates.items():
+        years, DH = annual_degree_hours(climate, T_bases, chunk_days, peak_hour)
+        year_index = np.searchsorted(years, np.asarray(climate['year']))
+        CDD = calculate_cdd_matrix(climate['Tmin[C]'], climate['Tmax[C]'], climate['Tavg[C]'], T_bases)
+        CDD_annual = np.column_stack([np.bincount(year_index, weights=CDD[:, j], minlength=len(years)) for j in range(len(T_bases))])
+        for j, scenario in enumerate(T_base_values):
+            frames.append(pd.DataFrame({
+                'site': site,
+                'scenario': scenario,
+                'year': years,
+                'CDD_daily': CDD_annual[:, j],
+                'CDD_hourly': DH[:, j] / 24,
+                'ED_daily': calculate_ed(CDD_annual[:, j], U_values[site]),
+                'ED_hourly': calculate_ed_degree_hours(DH[:, j], U_values[site]),
+            }))
+    return pd.concat(frames, ignore_index=True)
+
+# Totals of a degree_hour_report per site and scenario, with the ratios of
+# the hourly to the daily model
+def summarize_degree_hour_report(report):
+    summary = report.groupby(['site', 'scenario'], sort=False)[['CDD_daily', 'CDD_hourly', 'ED_daily', 'ED_hourly']].sum()
+    summary['CDD_ratio'] = summary['CDD_hourly'] / summary['CDD_daily']
+    summary['ED_ratio'] = summary['ED_hourly'] / summary['ED_daily']
+    return summary
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+# CO₂ emissions of the ED engine's output with grid emission factors that
+# change over time. Factors are read from a CSV such as
+# data/emission_factors.csv:
+#
+#   country,year,factor
+#   Norway,2021,0.012
+#   ...
+#
+# in kg CO₂ per kWh. Each country's anchor years are interpolated linearly
+# and held constant before the first and after the last, so a single anchor
+# is a constant factor and a grid decarbonization pathway is a few more rows.
+# Sites map to countries through the registry's optional "country" key (the
+# site name otherwise).
+
+# {country: (years, factors)} with anchors sorted by year
+def load_emission_factors(path):
+    df = pd.read_csv(path, comment='#')
+    missing = {'country', 'year', 'factor'} - set(df.columns)
+    if missing:
+        raise ValueError(f"{path}: missing columns {sorted(missing)}")
+    factors = {}
+    for country, rows in df.groupby('country', sort=False):
+        rows = rows.sort_values('year')
+        if rows['year'].duplicated().any():
+            raise ValueError(f"{path}: repeated years for {country}")
+        factors[country] = (rows['year'].to_numpy(dtype=float), rows['factor'].to_numpy(dtype=float))
+    return factors
+
+# Factor of every country in every year, (countries x years), kg CO₂/kWh
+def emission_factor_matrix(factors, countries, years):
+    years = np.asarray(years, dtype=float)
+    unknown = [country for country in countries if country not in factors]
+    if unknown:
+        raise KeyError(f"no emission factors for {unknown}")
+    return np.array([np.interp(years, *factors[country]) for country in countries]).reshape(len(countries), len(years))
+
+# Country of each site of a registry
+def site_countries(registry):
+    return [site.get('country', name) for name, site in registry['sites'].items()]
+
+# Annual and cumulative ED and CO₂ of an annual_ed_tensor in one broadcast
+# over (site x pathway x scenario x year). countries gives the country of
+# each site (default: the site names). Returns the tensor's axis labels with
+#   'ED', 'CO2'                        annual kWh and kg
+#   'cumulative_ED', 'cumulative_CO2'  running totals from the first year
+#   'factors'                          (site x year) kg CO₂/kWh
+# Years without ED stay NaN in the annual arrays and add nothing to the
+# running totals.
+def co2_tensor(tensor, factors, countries=None):
+    countries = list(tensor['sites']) if countries is None else list(countries)
+    F = emission_factor_matrix(factors, countries, tensor['years'])
+    ED = tensor['ED']
+    CO2 = ED * F[:, np.newaxis, np.newaxis, :]
+    return {
+        'sites': tensor['sites'], 'pathways': tensor['pathways'], 'scenarios': tensor['scenarios'],
+        'years': tensor['years'],
+        'ED': ED,
+        'CO2': CO2,
+        'cumulative_ED': np.nancumsum(ED, axis=-1),
+        'cumulative_CO2': np.nancumsum(CO2, axis=-1),
+        'factors': F,
+    }
+
+# Long table of a co2_tensor result: one row per (site, pathway, scenario,
+# year) with the emission factor, annual and cumulative ED and CO₂
+def emissions_frame(emissions):
+    sites, pathways, scenarios, years = (emissions[axis] for axis in ('sites', 'pathways', 'scenarios', 'years'))
+    index = pd.MultiIndex.from_product([sites, pathways, scenarios, years], names=['site', 'pathway', 'scenario', 'year'])
+    factors = np.broadcast_to(emissions['factors'][:, np.newaxis, np.newaxis, :], emissions['ED'].shape)
+    return pd.DataFrame({
+        'factor': factors.ravel(),
+        'ED': emissions['ED'].ravel(),
+        'CO2': emissions['CO2'].ravel(),
+        'cumulative_ED': emissions['cumulative_ED'].ravel(),
+        'cumulative_CO2': emissions['cumulative_CO2'].ravel(),
+    }, index=index).reset_index()
+
+# Totals from start_year up to each of end_years inclusive, one row per
+# (site, pathway, scenario) and columns ED_<end> and CO2_<end>
+def emissions_summary(emissions, start_year, end_years):
+    years = np.asarray(emissions['years'])
+    columns = {}
+    for end_year in end_years:
+        in_period = (years >= start_year) & (years <= end_year)
+        # Combinations without any ED in the period stay NaN
+        covered = ~np.isnan(emissions['ED'][..., in_period]).all(axis=-1)
+        for variable in ('ED', 'CO2'):
+            total = np.nansum(emissions[variable][..., in_period], axis=-1)
+            columns[f"{variable}_{end_year}"] = np.where(covered, total, np.nan).ravel()
+    index = pd.MultiIndex.from_product(
+        [emissions['sites'], emissions['pathways'], emissions['scenarios']], names=['site', 'pathway', 'scenario'])
+    return pd.DataFrame(columns, index=index).reset_index()
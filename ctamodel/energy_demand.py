@@ -0,0 +1,200 @@
+import numpy as np
+import pandas as pd
+
+from .climate_data import iter_climate_chunks, load_climate
+from .degree_days import calculate_cdd_matrix
+
+# Francesca's Method 1 for SH calculation
+def calculate_sh_method1(T, RH):
+    # Convert T in Celsius and RH in percentage to SH in g/kg
+    SH = 38.015 * (10 ** ((7.65 * T) / (243.12 + T)) * RH) / (1013.25 - (0.06112 * 10 ** ((7.65 * T) / (243.12 + T)) * RH))
+    return SH  # in g/kg
+
+# U-values and constants
+A_over_V = 1
+hours_per_year = 8760
+
+# Define function to calculate energy demand
+def calculate_ed(CDD, U_value):
+    return (A_over_V * hours_per_year * U_value * CDD) / 1000  # kWh
+
+# Define function to calculate humidity energy demand based on SH
+def calculate_humidity_ed(SH, ACH=1.0, k=2.78*10**(-7), L_evap=2257, rho_air=1.225):
+    return ACH * hours_per_year * k * L_evap * rho_air * SH / 1000  # kWh
+
+# Per-group sums of each column of a (rows x columns) array, where inverse
+# maps every row to its group (as returned by np.unique)
+def group_sums(inverse, values, n_groups):
+    return np.column_stack([np.bincount(inverse, weights=values[:, j], minlength=n_groups) for j in range(values.shape[1])])
+
+# Streaming version of the annual CDD/SH aggregation. Reads a climate file in
+# chunks, computes daily CDD for every base temperature and daily SH for every
+# RH value on the fly, and folds them into per-year sums. Memory use depends
+# on chunksize and the number of years, not on the length of the file.
+#
+# T_base_values and RH_values map scenario names to values, e.g.
+# {"Good": 2, "Average": 7, "Bad": 15}. Returns the annual CDD sums and SH
+# means as two DataFrames indexed by year with columns CDD_<scenario> and
+# SH_<scenario>, the same numbers groupby('year') gives on the full frame.
+def stream_annual_cdd_sh(path, T_base_values, RH_values, chunksize=100_000):
+    T_bases = list(T_base_values.values())
+    RHs = list(RH_values.values())
+
+    # year -> [CDD sums, SH sums, day count]
+    accumulators = {}
+    for chunk in iter_climate_chunks(path, chunksize=chunksize):
+        Tavg = chunk['Tavg[C]'].astype(float)
+        cdd = calculate_cdd_matrix(chunk['Tmin[C]'], chunk['Tmax[C]'], Tavg, T_bases)
+        sh = np.column_stack([calculate_sh_method1(Tavg, RH) for RH in RHs])
+
+        years, inverse = np.unique(chunk['year'], return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(years))
+        cdd_sums = group_sums(inverse, cdd, len(years))
+        sh_sums = group_sums(inverse, sh, len(years))
+
+        for i, year in enumerate(years.tolist()):
+            acc = accumulators.setdefault(year, [np.zeros(len(T_bases)), np.zeros(len(RHs)), 0])
+            acc[0] += cdd_sums[i]
+            acc[1] += sh_sums[i]
+            acc[2] += counts[i]
+
+    years = sorted(accumulators)
+    index = pd.Index(years, name='year')
+    CDD = pd.DataFrame(
+        [accumulators[year][0] for year in years], index=index,
+        columns=[f'CDD_{scenario}' for scenario in T_base_values],
+    )
+    SH = pd.DataFrame(
+        [accumulators[year][1] / accumulators[year][2] for year in years], index=index,
+        columns=[f'SH_{scenario}' for scenario in RH_values],
+    )
+    return CDD, SH
+
+# Prefix-sum index for cumulative ED queries over one site. CDD and SH are
+# the annual CDD sums and SH means (DataFrames indexed by year, columns
+# CDD_<scenario> and SH_<scenario>, as produced by groupby('year') or
+# stream_annual_cdd_sh). The index stores running totals with a leading
+# zero row, so the total over any span of years is one subtraction.
+def build_ed_index(CDD, SH):
+    scenarios = [column[len('CDD_'):] for column in CDD.columns]
+    SH = SH.loc[CDD.index, [f'SH_{scenario}' for scenario in scenarios]]
+    zero = np.zeros((1, len(scenarios)))
+    return {
+        'years': CDD.index.to_numpy(),
+        'scenarios': scenarios,
+        'CDD': np.concatenate([zero, np.cumsum(CDD.to_numpy(dtype=float), axis=0)]),
+        'SH': np.concatenate([zero, np.cumsum(SH.to_numpy(dtype=float), axis=0)]),
+    }
+
+# Same index built straight from daily series: year is the daily year
+# column and CDD/SH are daily DataFrames with CDD_<scenario> and
+# SH_<scenario> columns. Rows are grouped by year value, not position, so
+# out-of-order rows (the Rome file has some) land in the right year.
+def build_ed_index_from_daily(year, CDD, SH):
+    years, inverse, counts = np.unique(np.asarray(year), return_inverse=True, return_counts=True)
+    CDD_annual = group_sums(inverse, CDD.to_numpy(dtype=float), len(years))
+    SH_annual = group_sums(inverse, SH.to_numpy(dtype=float), len(years))
+    index = pd.Index(years, name='year')
+    return build_ed_index(
+        pd.DataFrame(CDD_annual, index=index, columns=CDD.columns),
+        pd.DataFrame(SH_annual / counts[:, np.newaxis], index=index, columns=SH.columns),
+    )
+
+# Total ED (thermal + humidity) from start_year to end_year inclusive, for
+# every scenario of the index, in constant time. start_year and end_year
+# may be arrays, in which case the result has one row per query and one
+# column per scenario. Years outside the series are clipped like .loc.
+def cumulative_ed(index, U_value, start_year, end_year):
+    start = np.searchsorted(index['years'], start_year, side='left')
+    end = np.searchsorted(index['years'], end_year, side='right')
+    end = np.maximum(start, end)
+    CDD = index['CDD'][end] - index['CDD'][start]
+    SH = index['SH'][end] - index['SH'][start]
+    return calculate_ed(CDD, U_value) + calculate_humidity_ed(SH)
+
+# Cumulative ED from start_year up to each year in start_year..end_year for
+# several sites in one vectorized pass. indices and U_values map a site
+# label to its index and U-value. Columns are <scenario>_<site>, scenario
+# first, e.g. Good_Norway, Good_Italy, Average_Norway, ...
+def cumulative_ed_table(indices, U_values, start_year, end_year):
+    years = np.arange(start_year, end_year + 1)
+    table = {"Year": years}
+    results = {site: cumulative_ed(index, U_values[site], start_year, years) for site, index in indices.items()}
+    scenarios = next(iter(indices.values()))['scenarios']
+    for j, scenario in enumerate(scenarios):
+        for site in indices:
+            table[f"{scenario}_{site}"] = results[site][:, j]
+    return pd.DataFrame(table)
+
+# Annual CDD, SH and ED for every site, pathway and scenario of a registry
+# (see registry.py) in one pass per climate file. Returns a dict with the
+# axis labels 'sites', 'pathways', 'scenarios' and 'years', and the arrays
+# 'CDD' (annual sums), 'SH' (annual means) and 'ED' (kWh, thermal +
+# humidity with each site's own U-value), all shaped
+# (site x pathway x scenario x year). Sites without a file for a pathway,
+# and years a file does not cover, are NaN.
+def annual_ed_tensor(registry, load=load_climate):
+    from .climate_view import ClimateView
+    from .registry import U_values, scenario_names, site_names
+
+    sites = site_names(registry)
+    pathways = list(registry['pathways'])
+    scenarios = scenario_names(registry)
+    T_bases = [registry['scenarios'][scenario]['T_base'] for scenario in scenarios]
+    RHs = np.array([registry['scenarios'][scenario]['RH'] for scenario in scenarios], dtype=float)
+
+    annual = {}
+    for i, site in enumerate(sites):
+        for j, pathway in enumerate(pathways):
+            path = registry['sites'][site]['climate'].get(pathway)
+            if path is None:
+                continue
+            # Daily CDD and SH are evaluated a chunk at a time and never held
+            # in full, however many scenarios the registry lists
+            view = ClimateView(load(path))
+            view.define_cdd(dict(zip(range(len(scenarios)), T_bases)), prefix='CDD_')
+            view.define_sh(dict(zip(range(len(scenarios)), RHs)), prefix='SH_')
+            cdd_names = [f'CDD_{s}' for s in range(len(scenarios))]
+            sh_names = [f'SH_{s}' for s in range(len(scenarios))]
+            totals = view.reduce(cdd_names + sh_names)
+            annual[i, j] = (
+                view.index.years,
+                totals.annual()[cdd_names].to_numpy(),
+                totals.annual('mean')[sh_names].to_numpy(),
+            )
+
+    years = np.unique(np.concatenate([entry[0] for entry in annual.values()])) if annual else np.array([], dtype=int)
+    shape = (len(sites), len(pathways), len(scenarios), len(years))
+    CDD = np.full(shape, np.nan)
+    SH = np.full(shape, np.nan)
+    for (i, j), (file_years, cdd, sh) in annual.items():
+        columns = np.searchsorted(years, file_years)
+        CDD[i, j][:, columns] = cdd.T
+        SH[i, j][:, columns] = sh.T
+
+    U = np.array(list(U_values(registry).values()), dtype=float)
+    ED = calculate_ed(CDD, U[:, np.newaxis, np.newaxis, np.newaxis]) + calculate_humidity_ed(SH)
+    return {
+        'sites': sites, 'pathways': pathways, 'scenarios': scenarios, 'years': years,
+        'CDD': CDD, 'SH': SH, 'ED': ED,
+    }
+
+# Select a sub-block of a tensor by labels, e.g.
+# select_ed(tensor, 'ED', site='Norway', pathway='SSP2-4.5') -> (scenario x year)
+def select_ed(tensor, variable='ED', site=None, pathway=None, scenario=None):
+    index = tuple(
+        slice(None) if label is None else tensor[axis].index(label)
+        for axis, label in (('sites', site), ('pathways', pathway), ('scenarios', scenario))
+    )
+    return tensor[variable][index]
+
+# Flatten one variable of a tensor into a DataFrame indexed by year with
+# (site, pathway, scenario) column levels, e.g. for writing to CSV
+def ed_tensor_frame(tensor, variable='ED'):
+    values = tensor[variable]
+    columns = pd.MultiIndex.from_product(
+        [tensor['sites'], tensor['pathways'], tensor['scenarios']], names=['site', 'pathway', 'scenario'])
+    return pd.DataFrame(
+        values.reshape(-1, values.shape[-1]).T,
+        index=pd.Index(tensor['years'], name='year'), columns=columns,
+    )
@@ -0,0 +1,257 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Headless batch rendering of the report figures. A figure is described by
+# a plain dict (a "spec") of numpy arrays and styling, built from pipeline
+# stage outputs, so specs are cheap to pickle and any process can draw them:
+#
+#   {'name': ..., 'figsize': (10, 6), 'xlabel': ..., 'ylabel': ..., 'title': ...,
+#    'series': [{'x': ..., 'y': ..., 'label': ..., 'color': ..., 'linestyle': ...,
+#                'kind': 'line' or 'scatter'}, ...],
+#    'hlines': [{'y': ..., ...}], 'vlines': [{'x': ..., ...}],
+#    'yscale': 'log', 'grid': True, 'legend': {...}, 'fontsize': {'label': 18, 'tick': 16}}
+#
+# Specs are rendered across worker processes with the Agg backend, so no
+# display is needed. Line series longer than max_points are reduced with
+# largest-triangle-three-buckets (LTTB) first, which keeps the peaks and
+# troughs a daily series shows at report resolution.
+
+# Indices of n_out points of (x, y) chosen by LTTB: the first and last
+# points are kept, the rest is cut into n_out - 2 buckets and each bucket
+# keeps the point forming the largest triangle with the point kept before it
+# and the mean of the next bucket. x must be increasing.
+def lttb(x, y, n_out):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Mean point of each bucket, plus the last point as the final "next bucket"
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    sizes = np.diff(edges)
+    mean_x = np.append(sums_x / sizes, x[-1])
+    mean_y = np.append(sums_y / sizes, y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        ax, ay = x[previous], y[previous]
+        area = np.abs((ax - mean_x[bucket + 1]) * (y[start:stop] - ay) - (ax - x[start:stop]) * (mean_y[bucket + 1] - ay))
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return selected
+
+# Numeric view of an x axis (dates become seconds) for downsampling
+def _as_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[s]').astype(np.int64).astype(float)
+    return x.astype(float)
+
+# Series of a spec with long lines downsampled and missing values dropped
+def _downsample(series, max_points):
+    x, y = np.asarray(series['x']), np.asarray(series['y'], dtype=float)
+    keep = ~np.isnan(y)
+    x, y = x[keep], y[keep]
+    if series.get('kind', 'line') == 'line' and max_points and len(x) > max_points:
+        index = lttb(_as_float(x), y, max_points)
+        x, y = x[index], y[index]
+    return x, y
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+
+# Draw one spec and save it as output_dir/<name>.<format> for each format.
+# Returns the written paths.
+def render_figure(spec, output_dir, formats=('png',), max_points=2000, dpi=100):
+    _init_worker()
+    import matplotlib.pyplot as plt
+
+    fontsize = spec.get('fontsize', {})
+    fig, ax = plt.subplots(figsize=spec.get('figsize', (10, 6)))
+    try:
+        for series in spec['series']:
+            x, y = _downsample(series, max_points)
+            style = {key: series[key] for key in ('label', 'color', 'linestyle') if key in series}
+            if series.get('kind', 'line') == 'scatter':
+                ax.scatter(x, y, **style)
+            else:
+                ax.plot(x, y, **style)
+        for line in spec.get('hlines', []):
+            ax.axhline(**line)
+        for line in spec.get('vlines', []):
+            ax.axvline(**line)
+        if 'yscale' in spec:
+            ax.set_yscale(spec['yscale'])
+        ax.set_xlabel(spec.get('xlabel', ''), fontsize=fontsize.get('label'))
+        ax.set_ylabel(spec.get('ylabel', ''), fontsize=fontsize.get('label'))
+        if 'tick' in fontsize:
+            ax.tick_params(labelsize=fontsize['tick'])
+        if 'title' in spec:
+            ax.set_title(spec['title'])
+        if spec.get('grid'):
+            ax.grid(True)
+        if spec.get('legend', {}) is not None:
+            ax.legend(**spec.get('legend', {}))
+        fig.tight_layout()
+
+        os.makedirs(output_dir, exist_ok=True)
+        paths = []
+        for fmt in formats:
+            path = os.path.join(output_dir, f"{spec['name']}.{fmt}")
+            fig.savefig(path, dpi=dpi)
+            paths.append(path)
+        return paths
+    finally:
+        plt.close(fig)
+
+# Render specs in parallel; workers=1 renders in-process, None uses one
+# worker per core. Returns {figure name: [paths]}.
+def render_figures(specs, output_dir, formats=('png',), max_points=2000, dpi=100, workers=None):
+    if workers == 1:
+        return {spec['name']: render_figure(spec, output_dir, formats, max_points, dpi) for spec in specs}
+    n = len(specs)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        paths = pool.map(render_figure, specs, [output_dir] * n, [formats] * n, [max_points] * n, [dpi] * n)
+        return {spec['name']: result for spec, result in zip(specs, paths)}
+
+# Figure builders of the report: each turns pipeline stage outputs (and the
+# pipeline parameters) into a spec, matching the figure of the script named
+# in its comment.
+
+SCENARIO_COLORS = {"Good": "green", "Average": "black", "Bad": "red"}
+TEMPERATURE_COLORS = {"2°C": "green", "7°C": "black", "15°C": "red"}
+
+def _site_label(params, site):
+    return params.get('site_labels', {}).get(site, site)
+
+# temperature_comparison.py: yearly average Tmin and Tmax per site
+def temperature_yearly_figure(outputs, params):
+    colors = iter(['blue', 'green', 'orange', 'red', 'purple', 'brown'])
+    series = []
+    for site, (yearly, _) in outputs['temperature_summary'].items():
+        for column in ('Tmin[C]', 'Tmax[C]'):
+            series.append({'x': yearly.index.to_numpy(), 'y': yearly[column].to_numpy(),
+                           'label': f"{_site_label(params, site)} {column[:4]} [°C]", 'color': next(colors)})
+    return {
+        'name': 'temperature_yearly', 'series': series, 'xlabel': 'Year', 'ylabel': 'Temperature (°C)',
+        'title': f"Yearly Average Temperature Comparison ({params['start_year']}-{params['end_year']})",
+    }
+
+# Daily mean temperature of every site over the whole series
+def temperature_daily_figure(outputs, params):
+    series = [
+        {'x': daily.index.to_numpy(), 'y': daily.to_numpy(), 'label': f"{_site_label(params, site)} Tavg [°C]"}
+        for site, (_, daily) in outputs['temperature_summary'].items()
+    ]
+    return {'name': 'temperature_daily', 'figsize': (14, 6), 'series': series, 'xlabel': 'Date',
+            'ylabel': 'Temperature (°C)', 'title': 'Daily Mean Temperature'}
+
+# plot_ED_(CDD-Francesca)_method1.py: annual thermal ED per scenario, one
+# line style per site
+def ed_annual_figure(outputs, params):
+    from .energy_demand import calculate_ed
+
+    linestyles = iter(['-', '--', ':', '-.'])
+    series = []
+    for site, (CDD, _) in outputs['annual_cdd_sh'].items():
+        linestyle = next(linestyles)
+        CDD = CDD.loc[params['start_year']:params['end_year']]
+        for scenario in params['T_base_values']:
+            series.append({'x': CDD.index.to_numpy(), 'y': calculate_ed(CDD[f'CDD_{scenario}'].to_numpy(), params['U_values'][site]),
+                           'label': f"{_site_label(params, site)} ED ({scenario})",
+                           'color': SCENARIO_COLORS.get(scenario), 'linestyle': linestyle})
+    return {
+        'name': 'ed_annual', 'figsize': (16, 10), 'series': series, 'xlabel': 'Year',
+        'ylabel': 'Total Energy Demand (kWh)', 'fontsize': {'label': 18, 'tick': 16},
+        'vlines': [{'x': 2024, 'color': 'blue', 'linestyle': '--', 'linewidth': 1.5, 'label': 'Current Year 2024'}],
+        'legend': {'loc': 'upper left', 'bbox_to_anchor': (1.02, 1), 'borderaxespad': 0},
+    }
+
+# DE_for_scenarios_plot.py: HOAc at the constant storage temperatures
+def degradation_figure(outputs, params):
+    curves = outputs['degradation_curves']
+    series = [{'x': curves['Year'].to_numpy(), 'y': curves[label].to_numpy(), 'label': label,
+               'color': TEMPERATURE_COLORS.get(label)} for label in params['storage_temperatures']]
+    HOAc0 = params['HOAc0']
+    return {
+        'name': 'degradation_storage', 'series': series, 'xlabel': 'Time (years)',
+        'ylabel': 'Acetic Acid Concentration (mol/m³)', 'fontsize': {'label': 18, 'tick': 16},
+        'hlines': [{'y': HOAc0, 'color': 'blue', 'linestyle': '--', 'label': f'Starting Point ({HOAc0:g} mol/m³)'}],
+    }
+
+# table1_Ahmad.py: simulated vs measured free acidity at 70°C
+def table1_figure(outputs, params):
+    curve = outputs['table1_curve']
+    time, observed = curve['observed']
+    return {
+        'name': 'ahmad_table1', 'grid': True, 'xlabel': 'Time (days)', 'ylabel': 'Free Acidity (mL of 0.1 M NaOH/g)',
+        'title': 'Degradation of Cellulose Triacetate at 70°C',
+        'series': [
+            {'x': curve['time'], 'y': curve['free_acidity'], 'label': 'Simulated Free Acidity', 'color': 'blue'},
+            {'x': np.asarray(time), 'y': np.asarray(observed), 'label': 'Experimental Data', 'color': 'red',
+             'kind': 'scatter'},
+        ],
+    }
+
+# table7_Ahmad.py: HOAc of the table 7 cases
+def table7_figure(outputs, params):
+    curves = outputs['table7_curves']
+    series = [{'x': curves['Month'].to_numpy(), 'y': curves[case].to_numpy(), 'label': case}
+              for case in curves.columns.drop('Month')]
+    return {'name': 'ahmad_table7', 'series': series, 'grid': True, 'xlabel': 'Time (months)',
+            'ylabel': 'Acetic Acid Concentration (mol/m³)',
+            'title': 'Increase in Acetic Acid Concentration in CTA Over Time'}
+
+# new_combination_ED&DE.py: degradation and cumulative ED of ed_site
+def ed_vs_degradation_figure(outputs, params):
+    combined = outputs['ed_vs_degradation']
+    labels = list(params['scenario_temperatures'].values())
+    series = [{'x': combined['Year'].to_numpy(), 'y': combined[f'HOAc_{label}'].to_numpy(),
+               'label': f'Degradation ({label})', 'color': TEMPERATURE_COLORS.get(label)} for label in labels]
+    series += [{'x': combined[f'ED_{label}'].to_numpy(), 'y': combined['Year'].to_numpy(), 'linestyle': '--',
+                'label': f"Cumulative ED ({label}, {params['ed_site']})", 'color': TEMPERATURE_COLORS.get(label)}
+               for label in labels]
+    return {'name': 'ed_vs_degradation', 'series': series, 'xlabel': 'Cumulative ED (kWh)',
+            'ylabel': 'Degradation Concentration', 'yscale': 'log'}
+
+# name -> (pipeline stages it reads, builder)
+FIGURES = {
+    'temperature_yearly': (('temperature_summary',), temperature_yearly_figure),
+    'temperature_daily': (('temperature_summary',), temperature_daily_figure),
+    'ed_annual': (('annual_cdd_sh',), ed_annual_figure),
+    'degradation_storage': (('degradation_curves',), degradation_figure),
+    'ahmad_table1': (('table1_curve',), table1_figure),
+    'ahmad_table7': (('table7_curves',), table7_figure),
+    'ed_vs_degradation': (('ed_vs_degradation',), ed_vs_degradation_figure),
+}
+
+# Build the specs of the named figures (default: all) from one pipeline
+# run, so stages shared by several figures are computed or loaded once
+def build_figure_specs(params, names=None, cache_dir=None, verbose=False):
+    from .pipeline import CACHE_DIR_NAME, PIPELINE
+
+    names = list(FIGURES) if names is None else list(names)
+    unknown = [name for name in names if name not in FIGURES]
+    if unknown:
+        raise KeyError(f"unknown figures {unknown}, expected some of {sorted(FIGURES)}")
+    stages = list(dict.fromkeys(stage for name in names for stage in FIGURES[name][0]))
+    outputs = PIPELINE.run(stages, params, cache_dir=cache_dir or CACHE_DIR_NAME, verbose=verbose)
+    return [FIGURES[name][1](outputs, params) for name in names]
+
+# Regenerate the report figures: pipeline outputs (cached on disk) -> specs
+# -> parallel rendering. Returns {figure name: [paths]}.
+def render_report(output_dir, params=None, names=None, formats=('png',), max_points=2000, dpi=100, workers=None,
+                  cache_dir=None, verbose=False):
+    from .pipeline import DEFAULT_PARAMS
+
+    specs = build_figure_specs(DEFAULT_PARAMS if params is None else params, names, cache_dir, verbose)
+    return render_figures(specs, output_dir, formats, max_points, dpi, workers)
@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+
+from .degradation import (
+    A, Ea, H2O0, HOAc0, ROAc0, acetic_acid_concentration, daily_exposure, exposure_to_reach, rate_constant,
+    season_of_month,
+)
+
+# Time for HOAc to reach one or more thresholds (e.g. the autocatalytic
+# point), solved for exactly instead of read off a densely sampled
+# trajectory. HOAc(t) >= N exactly when the exposure ∫k dt reaches
+# exposure_to_reach(HOAc0, N), and the exposure grows linearly within any
+# phase of constant temperature, so a crossing is located by finding the
+# phase in which the exposure passes the target and solving the linear
+# equation inside it:
+#
+#   t* = t_phase + (E* - E_phase) / k_phase
+#
+# Thresholds at or below HOAc0 are reached at time 0; thresholds that are
+# never reached within the horizon (or at all, at or above
+# min(ROAc0, H2O0)) give inf seconds, or NaT for dates.
+
+SECONDS_PER_DAY = 24 * 3600
+
+# Seconds until each threshold at constant rate constant k (both broadcast)
+def time_to_threshold(k, thresholds, HOAc0=HOAc0, ROAc0=ROAc0, H2O0=H2O0):
+    exposure = exposure_to_reach(HOAc0, thresholds, ROAc0, H2O0)
+    with np.errstate(invalid='ignore'):
+        return np.where(exposure == 0, 0.0, np.divide(exposure, k))
+
+# Exhibition + cold storage calendars, as in simulate_degradation_grid: every
+# (cold_storage_months, exhibition_days) cell advances one cycle per
+# iteration in lock-step, carrying its exposure at the start of each phase.
+# A cell drops out once its calendar passes end_date or it has crossed all
+# thresholds, so short lifetimes cost only the cycles they last.
+#
+# Returns seconds from start_date as a
+# (len(cold_storage_lengths), len(exhibition_lengths), len(thresholds))
+# array; inf where a threshold is not reached before end_date.
+def cycle_time_to_threshold(exhibition_lengths, cold_storage_lengths, thresholds, start_date, end_date, season_temps,
+                            cold_storage_temp, HOAc0=HOAc0, ROAc0=ROAc0, H2O0=H2O0, A=A, Ea=Ea):
+    cold_months, exhibition_days = np.meshgrid(cold_storage_lengths, exhibition_lengths, indexing='ij')
+    exhibition_days = exhibition_days.ravel().astype(np.int64)
+    storage_days = cold_months.ravel().astype(np.int64) * 30
+    targets = np.atleast_1d(exposure_to_reach(HOAc0, np.asarray(thresholds, dtype=float), ROAc0, H2O0))
+
+    k_by_month = np.array([rate_constant(season_temps[season_of_month(month)], A, Ea) for month in range(1, 13)])
+    k_cold_storage = rate_constant(cold_storage_temp, A, Ea)
+
+    start = np.datetime64(start_date, 'D')
+    end = np.datetime64(end_date, 'D')
+    horizon = float((end - start).astype(np.int64) * SECONDS_PER_DAY)
+    date = np.full(exhibition_days.shape, start)
+    exposure = np.zeros(exhibition_days.shape)
+    crossing = np.where(targets == 0, 0.0, np.inf)[np.newaxis, :].repeat(len(exhibition_days), axis=0)
+
+    active = np.flatnonzero((date < end) & np.isinf(crossing).any(axis=1))
+    while active.size:
+        month = date[active].astype('datetime64[M]').astype(np.int64) % 12
+        phases = [
+            (k_by_month[month], exhibition_days[active]),
+            (np.full(active.size, k_cold_storage), storage_days[active]),
+        ]
+        for k, phase_days in phases:
+            before = exposure[active]
+            after = before + k * phase_days * SECONDS_PER_DAY
+            # Crossings inside this phase, solved linearly in time
+            inside = (before[:, np.newaxis] < targets) & (targets <= after[:, np.newaxis])
+            t_phase = (date[active] - start).astype(np.int64) * float(SECONDS_PER_DAY)
+            t_cross = t_phase[:, np.newaxis] + (targets - before[:, np.newaxis]) / k[:, np.newaxis]
+            crossing[active] = np.where(inside & (t_cross < horizon), t_cross, crossing[active])
+            exposure[active] = after
+            date[active] += phase_days
+        active = active[(date[active] < end) & np.isinf(crossing[active]).any(axis=1)]
+
+    return crossing.reshape(len(cold_storage_lengths), len(exhibition_lengths), len(targets))
+
+# Daily climate forcing, as in simulate_daily_climate: k is constant over
+# each day, so the day of each crossing is a binary search in the cumulative
+# exposure and the time of day follows from that day's rate. Returns
+# {site: DataFrame} of crossing dates with one row per scenario and one
+# column per threshold; NaT where the series ends first.
+def daily_climate_time_to_threshold(climates, T_base_values, thresholds, HOAc0=HOAc0, ROAc0=ROAc0, H2O0=H2O0,
+                                    A=A, Ea=Ea):
+    thresholds = list(np.atleast_1d(thresholds))
+    targets = np.atleast_1d(exposure_to_reach(HOAc0, np.asarray(thresholds, dtype=float), ROAc0, H2O0))
+    results = {}
+    for site, climate in climates.items():
+        dates, k, exposure = daily_exposure(climate, T_base_values, A, Ea)
+        crossing = np.full((len(T_base_values), len(targets)), np.datetime64('NaT', 'ns'))
+        for j in range(len(T_base_values)):
+            day = np.searchsorted(exposure[:, j], targets, side='left')
+            found = day < len(dates)
+            day = np.minimum(day, len(dates) - 1)
+            before = np.where(day > 0, exposure[day - 1, j], 0.0)
+            seconds = np.where(found & (targets > 0), (targets - before) / k[day, j], 0.0)
+            times = dates[day] + np.round(seconds * 1e9).astype('timedelta64[ns]')
+            crossing[j] = np.where(found, times, np.datetime64('NaT', 'ns'))
+        results[site] = pd.DataFrame(crossing, index=pd.Index(list(T_base_values), name='scenario'),
+                                     columns=pd.Index(thresholds, name='threshold'))
+    return results
+
+# General forcing with a numerical solver: k_of_t(t) gives the rate constant
+# at t seconds and solve_ivp locates each crossing with an event function
+# (direction +1), stopping at the highest threshold. Returns seconds per
+# threshold, inf where t_max comes first.
+def time_to_threshold_ode(k_of_t, thresholds, t_max, HOAc0=HOAc0, ROAc0=ROAc0, H2O0=H2O0, method='RK45',
+                          **solver_kwargs):
+    from .profiling import solve_ivp
+
+    thresholds = np.atleast_1d(np.asarray(thresholds, dtype=float))
+    pending = np.flatnonzero(thresholds > HOAc0)
+    crossing = np.where(thresholds > HOAc0, np.inf, 0.0)
+    if not pending.size:
+        return crossing
+
+    events = []
+    for i in pending:
+        def event(t, HOAc, level=thresholds[i]):
+            return HOAc[0] - level
+        event.direction = 1
+        event.terminal = thresholds[i] == thresholds[pending].max()
+        events.append(event)
+
+    def rhs(t, HOAc):
+        return acetic_acid_concentration(t, HOAc, k_of_t(t), ROAc0, H2O0)
+
+    solution = solve_ivp(rhs, (0, t_max), [HOAc0], method=method, events=events, **solver_kwargs)
+    for i, times in zip(pending, solution.t_events):
+        if len(times):
+            crossing[i] = times[0]
+    return crossing
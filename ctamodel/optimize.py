@@ -0,0 +1,207 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from . import degradation
+from .degradation import daily_exposure, hoac_after_exposure, rate_constant, season_of_month
+from .degree_days import annual_cdd, build_cdd_index
+from .energy_demand import calculate_ed, calculate_humidity_ed, calculate_sh_method1, group_sums
+
+# Search over storage setpoints and exhibition/storage calendars, trading
+# the cooling energy of the storage vault against the degradation of the
+# films kept in it. A candidate is
+#
+#   (site, T_base, RH, exhibition_days, cold_storage_months)
+#
+# and is scored on start_year..end_year by
+#
+#   ED                 cumulative vault ED (thermal + humidity, kWh), as in
+#                      cumulative_ed for the setpoint (T_base, RH)
+#   CO2                each year's ED times that year's emission factor of
+#                      the site (kg)
+#   HOAc               acetic acid at the end of end_year (mol/m³)
+#   exhibition_share   fraction of days the film spends on exhibition
+#
+# Degradation couples to the same climate as the ED: in storage the film
+# follows the vault's daily indoor temperature min(Tavg, T_base)
+# (indoor_temperature), and each exhibition runs at the season temperature of
+# its first day, as in simulate_degradation. Cycles are cut at the horizon.
+#
+# Every site is reduced once to lookup tables (annual ED per setpoint, with
+# CDD for the whole T_base grid from one sorted-temperature index, and
+# storage exposure per day and T_base), after which a candidate costs one
+# table lookup per cycle. The whole grid is evaluated in chunks across a
+# process pool and the result is the Pareto front of the candidates whose
+# HOAc stays within max_HOAc: lowest ED and CO2, most exhibition time.
+
+SECONDS_PER_DAY = 24 * 3600
+OBJECTIVES = ('ED', 'CO2', 'exhibition_share')
+
+# Lookup tables of one site for the horizon start_year..end_year:
+#   'annual_ED'   ED of each year (kWh), (years x T_bases x RHs)
+#   'ED'          cumulative ED (kWh), (T_bases x RHs)
+#   'exposure'    storage exposure ∫k dt from the start to each day,
+#                 (T_bases x days + 1)
+#   'k_by_month'  exhibition rate constant for each calendar month
+def site_tables(climate, T_bases, RHs, U_value, start_year, end_year, season_temps, A=degradation.A,
+                Ea=degradation.Ea):
+    year = np.asarray(climate['year'])
+    in_horizon = (year >= start_year) & (year <= end_year)
+    Tavg = np.asarray(climate['Tavg[C]'], dtype=float)[in_horizon]
+    years, inverse, counts = np.unique(year[in_horizon], return_inverse=True, return_counts=True)
+    if len(years) != end_year - start_year + 1:
+        raise ValueError(f"the climate series does not cover {start_year}-{end_year}")
+    CDD = annual_cdd(build_cdd_index(year[in_horizon], np.asarray(climate['Tmin[C]'])[in_horizon],
+                                     np.asarray(climate['Tmax[C]'])[in_horizon], Tavg), T_bases)
+    SH = group_sums(inverse, calculate_sh_method1(Tavg[:, np.newaxis], np.asarray(RHs, dtype=float)[np.newaxis, :]),
+                    len(years)) / counts[:, np.newaxis]
+    annual_ED = calculate_ed(CDD, U_value)[:, :, np.newaxis] + calculate_humidity_ed(SH)[:, np.newaxis, :]
+
+    # Exposure is piecewise linear in time between the climate's dates, so
+    # interpolating its running total at whole days is exact
+    start = np.datetime64(f'{start_year}-01-01', 's')
+    n_days = int((np.datetime64(f'{end_year + 1}-01-01', 'D') - start.astype('datetime64[D]')).astype(np.int64))
+    dates, _, exposure = daily_exposure(climate, {T_base: T_base for T_base in T_bases}, A, Ea)
+    t = (dates.astype('datetime64[s]') - start).astype(np.int64).astype(float)
+    t = np.append(t, t[-1] + SECONDS_PER_DAY)
+    exposure = np.vstack([np.zeros((1, len(T_bases))), exposure])
+    t_day = np.arange(n_days + 1) * float(SECONDS_PER_DAY)
+    storage = np.array([np.interp(t_day, t, exposure[:, j]) for j in range(len(T_bases))])
+    storage -= storage[:, :1]
+
+    return {
+        'start': np.datetime64(f'{start_year}-01-01', 'D'),
+        'n_days': n_days,
+        'years': years,
+        'annual_ED': annual_ED,
+        'ED': annual_ED.sum(axis=0),
+        'exposure': storage,
+        'k_by_month': np.array([rate_constant(season_temps[season_of_month(month)], A, Ea) for month in range(1, 13)]),
+    }
+
+# HOAc at the horizon and exhibition share of a batch of candidates of one
+# site, all cycles advancing in lock-step. T_base_index selects the row of
+# tables['exposure'] of each candidate.
+def evaluate_schedules(tables, T_base_index, exhibition_days, cold_storage_months, HOAc0=degradation.HOAc0,
+                       ROAc0=degradation.ROAc0, H2O0=degradation.H2O0):
+    T_base_index = np.asarray(T_base_index, dtype=np.int64)
+    exhibition_days = np.asarray(exhibition_days, dtype=np.int64)
+    cycle_days = exhibition_days + np.asarray(cold_storage_months, dtype=np.int64) * 30
+    n_days = tables['n_days']
+    storage = tables['exposure']
+
+    day = np.zeros(len(T_base_index), dtype=np.int64)
+    exposure = np.zeros(len(T_base_index))
+    on_exhibition = np.zeros(len(T_base_index), dtype=np.int64)
+    active = np.arange(len(T_base_index))
+    while active.size:
+        month = (tables['start'] + day[active]).astype('datetime64[M]').astype(np.int64) % 12
+        exhibition_end = np.minimum(day[active] + exhibition_days[active], n_days)
+        storage_end = np.minimum(day[active] + cycle_days[active], n_days)
+        rows = T_base_index[active]
+        exposure[active] += (tables['k_by_month'][month] * (exhibition_end - day[active]) * SECONDS_PER_DAY
+                             + storage[rows, storage_end] - storage[rows, exhibition_end])
+        on_exhibition[active] += exhibition_end - day[active]
+        day[active] = storage_end
+        active = active[day[active] < n_days]
+
+    return hoac_after_exposure(HOAc0, exposure, ROAc0, H2O0), on_exhibition / n_days
+
+# Tables of the sites, set once per worker process
+_worker_tables = None
+
+def _init_worker(tables):
+    global _worker_tables
+    _worker_tables = tables
+
+# Worker entry point: one chunk of candidates of one site
+def _evaluate_chunk(site, T_base_index, exhibition_days, cold_storage_months, kinetics):
+    return evaluate_schedules(_worker_tables[site], T_base_index, exhibition_days, cold_storage_months, **kinetics)
+
+# Boolean mask of the non-dominated rows of a (candidates x objectives)
+# array, every objective minimized
+def pareto_front(objectives):
+    objectives = np.asarray(objectives, dtype=float)
+    order = np.lexsort(objectives.T[::-1])
+    front = []
+    for i in order:
+        if front:
+            members = objectives[front]
+            if np.any(np.all(members <= objectives[i], axis=1) & np.any(members < objectives[i], axis=1)):
+                continue
+            if np.any(np.all(members == objectives[i], axis=1)):
+                continue
+        front.append(i)
+    mask = np.zeros(len(objectives), dtype=bool)
+    mask[front] = True
+    return mask
+
+# Evaluate every combination of the candidate axes and return the Pareto
+# front as a DataFrame sorted by ED, one row per candidate with its settings,
+# objectives and HOAc. climates, U_values and emission_factors map a site
+# to its typed climate columns, U-value and kg CO₂ per kWh (one factor, or
+# one per year of the horizon as from emission_factor_matrix); season_temps
+# are the exhibition temperatures in K as in simulate_degradation. Equivalent
+# candidates (identical objectives) appear once. workers=1 runs in-process,
+# None uses one worker per core.
+def optimize_schedules(climates, U_values, emission_factors, T_bases, RHs, exhibition_lengths, cold_storage_lengths,
+                       start_year, end_year, max_HOAc, season_temps, HOAc0=degradation.HOAc0,
+                       ROAc0=degradation.ROAc0, H2O0=degradation.H2O0, A=degradation.A, Ea=degradation.Ea,
+                       workers=None, chunk_size=50_000):
+    T_bases = np.asarray(T_bases, dtype=float)
+    RHs = np.asarray(RHs, dtype=float)
+    tables = {
+        site: site_tables(climate, T_bases, RHs, U_values[site], start_year, end_year, season_temps, A, Ea)
+        for site, climate in climates.items()
+    }
+    kinetics = {'HOAc0': HOAc0, 'ROAc0': ROAc0, 'H2O0': H2O0}
+
+    # HOAc does not depend on RH, so schedules are evaluated per
+    # (site, T_base, exhibition, storage) and crossed with RH afterwards
+    T_base_index, cold_index, exhibition_index = np.meshgrid(
+        np.arange(len(T_bases)), np.arange(len(cold_storage_lengths)), np.arange(len(exhibition_lengths)),
+        indexing='ij')
+    T_base_index, cold_index, exhibition_index = T_base_index.ravel(), cold_index.ravel(), exhibition_index.ravel()
+    exhibition_days = np.asarray(exhibition_lengths)[exhibition_index]
+    cold_storage_months = np.asarray(cold_storage_lengths)[cold_index]
+    chunks = [
+        (site, T_base_index[i:i + chunk_size], exhibition_days[i:i + chunk_size], cold_storage_months[i:i + chunk_size])
+        for site in climates for i in range(0, len(T_base_index), chunk_size)
+    ]
+    if workers == 1:
+        _init_worker(tables)
+        results = [_evaluate_chunk(*chunk, kinetics) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(tables,)) as pool:
+            results = list(pool.map(_evaluate_chunk, *zip(*chunks), [kinetics] * len(chunks)))
+
+    n_years = end_year - start_year + 1
+    CO2 = {
+        site: np.tensordot(np.broadcast_to(np.asarray(emission_factors[site], dtype=float), (n_years,)),
+                           table['annual_ED'], axes=1)
+        for site, table in tables.items()
+    }
+    frames = []
+    for (site, rows, days, months), (HOAc, share) in zip(chunks, results):
+        feasible = HOAc <= max_HOAc
+        for r, RH in enumerate(RHs):
+            ED = tables[site]['ED'][rows[feasible], r]
+            frames.append(pd.DataFrame({
+                'site': site,
+                'T_base': T_bases[rows[feasible]],
+                'RH': RH,
+                'exhibition_days': days[feasible],
+                'cold_storage_months': months[feasible],
+                'ED': ED,
+                'CO2': CO2[site][rows[feasible], r],
+                'exhibition_share': share[feasible],
+                'HOAc': HOAc[feasible],
+            }))
+    candidates = pd.concat(frames, ignore_index=True)
+    if candidates.empty:
+        return candidates
+
+    objectives = candidates[list(OBJECTIVES)].to_numpy(dtype=float) * np.array([1, 1, -1])
+    front = candidates[pareto_front(objectives)]
+    return front.sort_values(['ED', 'exhibition_share'], ascending=[True, False]).reset_index(drop=True)
@@ -0,0 +1,179 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from .degradation import H2O0, ROAc0, _bounds, hoac_after_exposure
+
+# Tabulated phase operators. A calendar simulation applies the same few
+# phases over and over (cold storage for a fixed number of months, an
+# exhibition of fixed length at one of the season temperatures) and only the
+# incoming HOAc changes. A phase at constant k for a given duration is the
+# map HOAc_in -> HOAc_out of its exposure k·duration, so it can be tabulated
+# once and every later application becomes a table lookup.
+#
+# The table lives in logit space, s = ln(HOAc / (m - HOAc)) with
+# m = min(ROAc0, H2O0), where the map is close to a shift and its slope is
+# known exactly from the separable rate law:
+#
+#   ds_out/ds_in = (M - HOAc_out) / (M - HOAc_in)
+#
+# Nodes are uniform in s between the ends of HOAc_range and the map is a
+# cubic Hermite spline through the exact values and slopes, with the slopes
+# limited as in Fritsch-Carlson so the interpolant stays monotone. Each
+# operator bounds its own error when it is built (error_bound in mol/m³,
+# rel_error_bound): the error of a cubic Hermite interpolant with exact
+# slopes is O(h^4) and smooth within an interval, so its largest value at
+# seven interior points, doubled, plus a few ulps for the rounding of the
+# output, covers the whole interval. Inputs outside HOAc_range fall back
+# to the exact propagator, which is within its own Newton tolerance.
+#
+# Operators are keyed by exposure rather than by (k, duration), so phases
+# with the same product share one table, and kept in a bounded LRU cache.
+
+DEFAULT_NODES = 257
+CHECK_POINTS = 7
+SAFETY = 2.0
+ROUNDING_ULPS = 4
+DEFAULT_MAXSIZE = 256
+
+def _logit(HOAc, m):
+    return np.log(HOAc) - np.log(m - HOAc)
+
+class PhaseOperator:
+    # HOAc_range=(low, None) runs the table up to 0.999·m
+    def __init__(self, exposure, ROAc0=ROAc0, H2O0=H2O0, HOAc_range=(1.0, None), nodes=DEFAULT_NODES):
+        m, M = (float(bound) for bound in _bounds(ROAc0, H2O0))
+        low, high = HOAc_range
+        high = 0.999 * m if high is None else float(high)
+        if not 0 < low < high < m:
+            raise ValueError(f"HOAc_range must lie inside (0, {m})")
+        if nodes < 2:
+            raise ValueError("a phase table needs at least two nodes")
+        self.exposure = float(exposure)
+        self.ROAc0 = ROAc0
+        self.H2O0 = H2O0
+        self.HOAc_range = (float(low), high)
+        self.m, self.M = m, M
+
+        self.s = np.linspace(_logit(low, m), _logit(high, m), nodes)
+        self.h = self.s[1] - self.s[0]
+        self.s_out, self.slopes = self._exact(self.s)
+
+        # Fritsch-Carlson: shrink the slopes at both ends of any interval
+        # whose (alpha, beta) leaves the circle of radius 3, and flatten
+        # intervals where the outputs have saturated at m
+        secants = np.diff(self.s_out) / self.h
+        with np.errstate(divide='ignore', invalid='ignore'):
+            radius = np.hypot(self.slopes[:-1], self.slopes[1:]) / secants
+            tau = np.where(secants > 0, np.minimum(1.0, 3 / radius), 0.0)
+        node_tau = np.ones(nodes)
+        node_tau[:-1] = tau
+        node_tau[1:] = np.minimum(node_tau[1:], tau)
+        self.slopes *= node_tau
+
+        # Error bound per interval: the largest error at CHECK_POINTS interior
+        # points, times SAFETY, plus the rounding of the output (a few ulps
+        # of the interval's largest HOAc). The output increases with the
+        # input, so the relative bound divides by the value at the left node.
+        fractions = np.arange(1, CHECK_POINTS + 1) / (CHECK_POINTS + 1)
+        check = self.s[:-1, np.newaxis] + self.h * fractions
+        table = self._interpolate(check.ravel()).reshape(check.shape)
+        exact = self._HOAc(self._exact(check.ravel())[0]).reshape(check.shape)
+        HOAc_out = self._HOAc(self.s_out)
+        interval_bound = (SAFETY * np.abs(table - exact).max(axis=1)
+                          + ROUNDING_ULPS * np.spacing(np.maximum(HOAc_out[1:], exact.max(axis=1))))
+        self.error_bound = float(interval_bound.max())
+        self.rel_error_bound = float((interval_bound / HOAc_out[:-1]).max())
+
+    # Exact s_out and ds_out/ds_in at the logits s. Outputs that round to m
+    # are kept just below it so their logit stays finite.
+    def _exact(self, s):
+        HOAc_in = self._HOAc(s)
+        HOAc_out = hoac_after_exposure(HOAc_in, self.exposure, self.ROAc0, self.H2O0)
+        HOAc_out = np.minimum(HOAc_out, np.nextafter(self.m, 0))
+        return _logit(HOAc_out, self.m), (self.M - HOAc_out) / (self.M - HOAc_in)
+
+    def _HOAc(self, s):
+        return self.m / (1 + np.exp(-s))
+
+    # Hermite interpolation of HOAc_out at the logits s (inside the table)
+    def _interpolate(self, s):
+        i = np.clip(((s - self.s[0]) / self.h).astype(np.int64), 0, len(self.s) - 2)
+        t = (s - self.s[i]) / self.h
+        t2, t3 = t * t, t * t * t
+        s_out = ((2 * t3 - 3 * t2 + 1) * self.s_out[i] + (t3 - 2 * t2 + t) * self.h * self.slopes[i]
+                 + (-2 * t3 + 3 * t2) * self.s_out[i + 1] + (t3 - t2) * self.h * self.slopes[i + 1])
+        return self._HOAc(s_out)
+
+    # HOAc after the phase for an array (or scalar) of incoming HOAc
+    def __call__(self, HOAc):
+        HOAc = np.asarray(HOAc, dtype=float)
+        inside = (HOAc >= self.HOAc_range[0]) & (HOAc <= self.HOAc_range[1])
+        result = np.empty(HOAc.shape)
+        result[inside] = self._interpolate(_logit(HOAc[inside], self.m))
+        if not inside.all():
+            result[~inside] = hoac_after_exposure(HOAc[~inside], self.exposure, self.ROAc0, self.H2O0)
+        return result if result.ndim else float(result)
+
+    @property
+    def nbytes(self):
+        return self.s.nbytes + self.s_out.nbytes + self.slopes.nbytes
+
+# Least recently used operators are dropped once maxsize are held. Options
+# such as HOAc_range and nodes apply to every table the cache builds.
+class PhaseOperatorCache:
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, **table_options):
+        self.maxsize = maxsize
+        self.table_options = table_options
+        self._operators = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, exposure, ROAc0=ROAc0, H2O0=H2O0):
+        key = (float(exposure), float(ROAc0), float(H2O0))
+        operator = self._operators.get(key)
+        if operator is not None:
+            self.hits += 1
+            self._operators.move_to_end(key)
+            return operator
+        self.misses += 1
+        operator = PhaseOperator(exposure, ROAc0, H2O0, **self.table_options)
+        self._operators[key] = operator
+        while len(self._operators) > self.maxsize:
+            self._operators.popitem(last=False)
+            self.evictions += 1
+        return operator
+
+    # Counters, memory held and the worst error bound of the cached operators
+    def info(self):
+        operators = list(self._operators.values())
+        return {
+            'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+            'size': len(operators), 'maxsize': self.maxsize,
+            'nbytes': sum(operator.nbytes for operator in operators),
+            'error_bound': max((operator.error_bound for operator in operators), default=0.0),
+            'rel_error_bound': max((operator.rel_error_bound for operator in operators), default=0.0),
+        }
+
+    def clear(self):
+        self._operators.clear()
+        self.hits = self.misses = self.evictions = 0
+
+PHASE_OPERATORS = PhaseOperatorCache()
+
+# Operator of a phase of `duration` seconds at constant k, from the shared
+# cache
+def phase_operator(k, duration, ROAc0=ROAc0, H2O0=H2O0):
+    return PHASE_OPERATORS.get(np.multiply(k, duration), ROAc0, H2O0)
+
+# Advance a batch of cells through one phase, each with its own exposure:
+# one operator per distinct exposure
+def advance_batch(HOAc, exposure, ROAc0=ROAc0, H2O0=H2O0):
+    HOAc = np.asarray(HOAc, dtype=float)
+    exposures, inverse = np.unique(np.broadcast_to(exposure, HOAc.shape), return_inverse=True)
+    result = np.empty(HOAc.shape)
+    for j, value in enumerate(exposures):
+        cells = inverse.reshape(HOAc.shape) == j
+        result[cells] = PHASE_OPERATORS.get(value, ROAc0, H2O0)(HOAc[cells])
+    return result
@@ -0,0 +1,310 @@
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from .climate_data import file_hash
+from .profiling import span
+
+# Stage DAG with an on-disk artifact cache. A stage is a function whose
+# positional arguments are the outputs of its input stages and whose keyword
+# arguments are named parameters. Its cache key hashes the stage's source
+# code, the version of the ctamodel sources, the values of the parameters it
+# declares (plus the contents of any files they name) and the keys of its
+# inputs, so changing a parameter only invalidates the stages downstream of
+# it. Keys are known before anything runs: a stage whose artifact is cached
+# is loaded without touching its inputs at all.
+
+CACHE_DIR_NAME = '.pipeline_cache'
+
+_package_version = None
+
+# Hash of all ctamodel sources: any change to the library invalidates the
+# cache, since stages call into it
+def package_version():
+    global _package_version
+    if _package_version is None:
+        digest = hashlib.sha256()
+        package_dir = os.path.dirname(os.path.abspath(__file__))
+        for name in sorted(os.listdir(package_dir)):
+            if name.endswith('.py'):
+                with open(os.path.join(package_dir, name), 'rb') as f:
+                    digest.update(name.encode() + b'\0' + f.read())
+        _package_version = digest.hexdigest()
+    return _package_version
+
+class Pipeline:
+    def __init__(self):
+        self.stages = {}
+
+    # Register a stage: inputs are names of other stages, params names of
+    # parameters, files the subset of params whose values are file paths
+    # (or dicts of them) hashed by content. cache=False stages are always
+    # recomputed when needed, e.g. cheap loaders whose output is large.
+    def stage(self, inputs=(), params=(), files=(), cache=True):
+        def register(func):
+            self.stages[func.__name__] = {
+                'func': func, 'inputs': tuple(inputs), 'params': tuple(params),
+                'files': tuple(files), 'cache': cache,
+            }
+            return func
+        return register
+
+    def key(self, name, params, _keys=None):
+        keys = {} if _keys is None else _keys
+        if name not in keys:
+            stage = self.stages[name]
+            missing = [param for param in stage['params'] if param not in params]
+            if missing:
+                raise KeyError(f"stage {name!r} needs parameters {missing}")
+            files = {}
+            for param in stage['files']:
+                paths = params[param]
+                files[param] = (
+                    {label: file_hash(path) for label, path in paths.items()} if isinstance(paths, dict)
+                    else file_hash(paths)
+                )
+            record = {
+                'stage': name,
+                'code': hashlib.sha256(inspect.getsource(stage['func']).encode()).hexdigest(),
+                'package': package_version(),
+                'params': {param: params[param] for param in stage['params']},
+                'files': files,
+                'inputs': [self.key(input_name, params, keys) for input_name in stage['inputs']],
+            }
+            keys[name] = hashlib.sha256(json.dumps(record, sort_keys=True, default=str).encode()).hexdigest()[:24]
+        return keys[name]
+
+    # Evaluate the targets (stage names) for the given parameters and return
+    # {target: output}. log collects (stage, 'cached' or 'computed',
+    # seconds) in evaluation order.
+    def run(self, targets, params, cache_dir=CACHE_DIR_NAME, verbose=False, log=None):
+        keys = {}
+        values = {}
+        log = [] if log is None else log
+
+        def evaluate(name):
+            if name in values:
+                return values[name]
+            stage = self.stages[name]
+            key = self.key(name, params, keys)
+            path = os.path.join(cache_dir, f'{name}-{key}.pkl')
+            if stage['cache'] and os.path.exists(path):
+                status = 'cached'
+                start = time.perf_counter()
+                with span(name, 'stage', status=status, key=key):
+                    with open(path, 'rb') as f:
+                        values[name] = pickle.load(f)
+            else:
+                status = 'computed'
+                inputs = [evaluate(input_name) for input_name in stage['inputs']]
+                start = time.perf_counter()
+                with span(name, 'stage', status=status, key=key):
+                    values[name] = stage['func'](*inputs, **{param: params[param] for param in stage['params']})
+                    if stage['cache']:
+                        _write_artifact(cache_dir, path, values[name])
+            log.append((name, status, time.perf_counter() - start))
+            if verbose:
+                print(f"{name}: {status} ({time.perf_counter() - start:.3f} s)")
+            return values[name]
+
+        return {target: evaluate(target) for target in targets}
+
+# Artifacts of every parameter set are kept side by side, so switching back
+# to earlier parameters is a cache hit; delete the cache directory to reclaim
+# the space
+def _write_artifact(cache_dir, path, value):
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, scratch = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(scratch, path)
+    except BaseException:
+        if os.path.exists(scratch):
+            os.remove(scratch)
+        raise
+
+# The ED / CO₂ and degradation stages of the repo's scripts:
+#
+#   climate -> daily_cdd_sh -> annual_cdd_sh -> cumulative_ed -> co2
+#   kinetics -> degradation_curves -> ed_vs_degradation <- cumulative_ed
+#
+# plus the data behind the report figures (see figures.py):
+#
+#   climate -> temperature_summary
+#   table1_curve, table7_curves
+
+PIPELINE = Pipeline()
+
+# Parameters for the bundled SSP2-4.5 data, as used by the scripts
+DEFAULT_PARAMS = {
+    'climate_files': {"Norway": 'trondheim_temperature_SSP2-45.csv', "Italy": 'rome_temperature_SSP2-45.csv'},
+    'T_base_values': {"Good": 2, "Average": 7, "Bad": 15},
+    'RH_values': {"Good": 0.30, "Average": 0.50, "Bad": 0.70},
+    'U_values': {"Norway": 0.18, "Italy": 0.32},
+    'start_year': 2015,
+    'end_year': 2065,
+    'emission_factors': 'data/emission_factors.csv',  # kg CO₂ per kWh by country and year
+    'site_countries': {"Norway": "Norway", "Italy": "Italy"},  # country of each site's factors
+    'A': 0.00103,
+    'Ea': 70734,
+    'HOAc0': 52,
+    'ROAc0': 13403.6,
+    'H2O0': 2137.2,
+    'storage_temperatures': {"2°C": 2, "7°C": 7, "15°C": 15},
+    'years': 50,
+    'method': 'analytic',
+    'ed_site': "Norway",
+    'site_labels': {"Norway": "Trondheim", "Italy": "Rome"},
+    'scenario_temperatures': {"Good": "2°C", "Average": "7°C", "Bad": "15°C"},
+    # Ahmad's table 1 at 70°C, with the adjusted constants of table1_Ahmad.py
+    # (A per day)
+    'table1_file': 'data/ahmad_table1.json',
+    'table1_kinetics': {'A': 1.03e5, 'Ea': 87e3},
+    # Ahmad's table 7 cases at 35°C over 18 months, as in table7_Ahmad.py
+    'table7_cases': {
+        "Case A": {"HOAc0": 52, "T": 308.15, "ROAc0": 13356.8, "H2O0": 2137.2},
+        "Case B": {"HOAc0": 59.8, "T": 308.15, "ROAc0": 13349.0, "H2O0": 1605.2},
+        "Case C": {"HOAc0": 52, "T": 308.15, "ROAc0": 13356.8, "H2O0": 1010.0},
+    },
+    'table7_months': 18,
+}
+
+@PIPELINE.stage(params=('climate_files',), files=('climate_files',), cache=False)
+def climate(climate_files):
+    from .climate_data import load_climate
+    return {site: load_climate(path) for site, path in climate_files.items()}
+
+@PIPELINE.stage(inputs=('climate',), params=('T_base_values', 'RH_values'), cache=False)
+def daily_cdd_sh(climate, T_base_values, RH_values):
+    from .degree_days import calculate_cdd_matrix
+    from .energy_demand import calculate_sh_method1
+    from .time_index import TimeIndex
+
+    daily = {}
+    for site, columns in climate.items():
+        Tavg = np.asarray(columns['Tavg[C]'], dtype=float)
+        CDD = pd.DataFrame(
+            calculate_cdd_matrix(columns['Tmin[C]'], columns['Tmax[C]'], Tavg, list(T_base_values.values())),
+            columns=[f'CDD_{scenario}' for scenario in T_base_values],
+        )
+        SH = pd.DataFrame({f'SH_{scenario}': calculate_sh_method1(Tavg, RH) for scenario, RH in RH_values.items()})
+        daily[site] = (TimeIndex.from_climate(columns), CDD, SH)
+    return daily
+
+# Annual CDD sums and SH means per site, indexed by year, from one segment
+# reduction over the days
+@PIPELINE.stage(inputs=('daily_cdd_sh',))
+def annual_cdd_sh(daily_cdd_sh):
+    annual = {}
+    for site, (index, CDD, SH) in daily_cdd_sh.items():
+        totals = index.reduce(pd.concat([CDD, SH], axis=1))
+        annual[site] = (totals.annual()[list(CDD.columns)], totals.annual('mean')[list(SH.columns)])
+    return annual
+
+# Cumulative ED from start_year up to each year (columns <scenario>_<site>)
+@PIPELINE.stage(inputs=('annual_cdd_sh',), params=('U_values', 'start_year', 'end_year'))
+def cumulative_ed(annual_cdd_sh, U_values, start_year, end_year):
+    from .energy_demand import build_ed_index, cumulative_ed_table
+
+    indices = {site: build_ed_index(CDD, SH) for site, (CDD, SH) in annual_cdd_sh.items()}
+    return cumulative_ed_table(indices, U_values, start_year, end_year)
+
+# Cumulative CO₂ emissions (kg): each year's ED times that year's emission
+# factor of the site's country (emission_factors is a factor file, see
+# emissions.py, and site_countries maps each site to its country), summed
+# from start_year
+@PIPELINE.stage(inputs=('cumulative_ed',), params=('emission_factors', 'site_countries', 'T_base_values'),
+                files=('emission_factors',))
+def co2(cumulative_ed, emission_factors, site_countries, T_base_values):
+    from .emissions import emission_factor_matrix, load_emission_factors
+
+    columns = [f"{scenario}_{site}" for scenario in T_base_values for site in site_countries]
+    countries = [country for _ in T_base_values for country in site_countries.values()]
+    missing = [column for column in columns if column not in cumulative_ed]
+    if missing:
+        raise KeyError(f"cumulative ED has no columns {missing}")
+    F = emission_factor_matrix(load_emission_factors(emission_factors), countries, cumulative_ed["Year"]).T
+    cumulative = cumulative_ed[columns].to_numpy(dtype=float)
+    annual = np.diff(cumulative, axis=0, prepend=0.0)
+    table = cumulative_ed[["Year"]].copy()
+    table[columns] = np.cumsum(annual * F, axis=0)
+    return table
+
+@PIPELINE.stage(params=('A', 'Ea', 'HOAc0', 'ROAc0', 'H2O0'))
+def kinetics(A, Ea, HOAc0, ROAc0, H2O0):
+    return {'A': A, 'Ea': Ea, 'HOAc0': HOAc0, 'ROAc0': ROAc0, 'H2O0': H2O0}
+
+# HOAc at constant storage temperatures (°C), once a year
+@PIPELINE.stage(inputs=('kinetics',), params=('storage_temperatures', 'years', 'method'))
+def degradation_curves(kinetics, storage_temperatures, years, method):
+    from .degradation import hoac_trajectory, rate_constant
+
+    year_grid = np.arange(0, years + 1)
+    t_eval = year_grid * 365.25 * 24 * 60 * 60
+    data = {"Year": year_grid}
+    for label, T in storage_temperatures.items():
+        k = rate_constant(T + 273.15, kinetics['A'], kinetics['Ea'])
+        data[label] = hoac_trajectory(k, t_eval, kinetics['HOAc0'], kinetics['ROAc0'], kinetics['H2O0'], method=method)
+    return pd.DataFrame(data)
+
+# Cumulative ED of one site (starting at 0) next to the degradation curve of
+# the matching storage temperature, by years since the start
+@PIPELINE.stage(inputs=('cumulative_ed', 'degradation_curves'), params=('ed_site', 'scenario_temperatures'))
+def ed_vs_degradation(cumulative_ed, degradation_curves, ed_site, scenario_temperatures):
+    ed = cumulative_ed.set_index(cumulative_ed["Year"] - cumulative_ed["Year"].iloc[0])
+    curves = degradation_curves.set_index("Year")
+    table = {}
+    for scenario, label in scenario_temperatures.items():
+        column = f"{scenario}_{ed_site}"
+        table[f"ED_{label}"] = ed[column] - ed[column].iloc[0]
+        table[f"HOAc_{label}"] = curves[label]
+    return pd.DataFrame(table).rename_axis("Year").dropna().reset_index()
+
+# Yearly mean Tmin/Tmax per site up to end_year, and the daily mean
+# temperature as a date-sorted series (repeated dates dropped)
+@PIPELINE.stage(inputs=('climate',), params=('end_year',))
+def temperature_summary(climate, end_year):
+    from .time_index import TimeIndex
+
+    summary = {}
+    for site, columns in climate.items():
+        frame = pd.DataFrame({name: np.asarray(columns[name]) for name in ('year', 'month', 'day', 'Tmin[C]', 'Tmax[C]', 'Tavg[C]')})
+        yearly = TimeIndex.from_climate(columns).reduce(frame[['Tmin[C]', 'Tmax[C]']]).annual('mean').loc[:end_year]
+        daily = pd.Series(frame['Tavg[C]'].to_numpy(), index=pd.to_datetime(frame[['year', 'month', 'day']]), name='Tavg[C]')
+        daily = daily[~daily.index.duplicated()].sort_index()
+        summary[site] = (yearly, daily)
+    return summary
+
+# Simulated free acidity over the experiment of table 1 (time in days, the
+# rate constant per day), next to the measured points
+@PIPELINE.stage(params=('table1_file', 'table1_kinetics'), files=('table1_file',))
+def table1_curve(table1_file, table1_kinetics):
+    from .calibration import FREE_ACIDITY_FACTOR, load_table
+    from .degradation import hoac_after_exposure, rate_constant
+
+    table = load_table(table1_file)
+    t = np.linspace(0, max(table['time']), 1000)
+    k = rate_constant(table['T'], table1_kinetics['A'], table1_kinetics['Ea'])
+    free_acidity = hoac_after_exposure(table['HOAc0'], k * t, table['ROAc0'], table['H2O0']) / FREE_ACIDITY_FACTOR
+    return {'time': t, 'free_acidity': free_acidity, 'observed': (table['time'], table['value'])}
+
+# HOAc of each table 7 case over table7_months (months of 30 days)
+@PIPELINE.stage(inputs=('kinetics',), params=('table7_cases', 'table7_months'))
+def table7_curves(kinetics, table7_cases, table7_months):
+    from .degradation import hoac_trajectory, rate_constant
+
+    months = np.linspace(0, table7_months, 100)
+    t = months * 30 * 24 * 3600
+    curves = {"Month": months}
+    for case, values in table7_cases.items():
+        k = rate_constant(values['T'], kinetics['A'], kinetics['Ea'])
+        curves[case] = hoac_trajectory(k, t, values['HOAc0'], values['ROAc0'], values['H2O0'])
+    return pd.DataFrame(curves)
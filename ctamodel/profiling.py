@@ -0,0 +1,237 @@
+import atexit
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+# Opt-in instrumentation. Set CTAMODEL_PROFILE to an output prefix, e.g.
+#
+#   CTAMODEL_PROFILE=profile python -m ctamodel run scenarios.json
+#
+# (or call enable()), and every instrumented span records its wall time and
+# the peak memory allocated above its starting point (tracemalloc; set
+# CTAMODEL_PROFILE_MEMORY=0 to skip it, since tracing slows allocation-heavy
+# code). At exit two files are written:
+#
+#   <prefix>.json        totals per (category, name): calls, seconds, peak
+#                        bytes and, for solver calls, the summed counters
+#   <prefix>.trace.json  every span in Chrome trace format, for
+#                        chrome://tracing or https://ui.perfetto.dev
+#
+# Worker processes of a pool inherit the variable and write their own files
+# with the pid appended to the prefix.
+#
+# Instrumented: pipeline stages, CLI jobs, climate file loading and every
+# solve_ivp call made through solve_ivp below. For a solver call the span
+# also carries nfev, njev, nlu, the number of accepted steps and, for the
+# explicit Runge-Kutta methods, the number of rejected steps. scipy does not
+# report rejections, so they are inferred from the right-hand-side
+# evaluations of each step: every attempt costs n_stages evaluations.
+#
+# When profiling is off, span() returns a shared no-op context and
+# solve_ivp() calls scipy directly, so the hooks cost one global lookup.
+
+ENV_VAR = 'CTAMODEL_PROFILE'
+MEMORY_ENV_VAR = 'CTAMODEL_PROFILE_MEMORY'
+
+_profiler = None
+_NULL_SPAN = nullcontext()
+
+class Profiler:
+    def __init__(self, prefix=None, memory=True):
+        self.prefix = prefix
+        self.memory = memory
+        self.pid = os.getpid()
+        self.events = []
+        self._local = threading.local()
+        self._origin = time.perf_counter_ns()
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def span(self, name, category, args):
+        return _Span(self, name, category, args)
+
+    # Totals per (category, name)
+    def summary(self):
+        totals = {}
+        for event in self.events:
+            entry = totals.setdefault((event['cat'], event['name']), {
+                'category': event['cat'], 'name': event['name'], 'calls': 0, 'seconds': 0.0,
+                'max_seconds': 0.0, 'peak_bytes': None,
+            })
+            seconds = event['dur'] / 1e6
+            entry['calls'] += 1
+            entry['seconds'] += seconds
+            entry['max_seconds'] = max(entry['max_seconds'], seconds)
+            peak = event['args'].get('peak_bytes')
+            if peak is not None:
+                entry['peak_bytes'] = max(entry['peak_bytes'] or 0, peak)
+            for counter in SOLVER_COUNTERS:
+                value = event['args'].get(counter)
+                if value is not None:
+                    entry[counter] = entry.get(counter, 0) + value
+        return sorted(totals.values(), key=lambda entry: -entry['seconds'])
+
+    def chrome_trace(self):
+        return {'traceEvents': [dict(event, ph='X', pid=self.pid) for event in self.events], 'displayTimeUnit': 'ms'}
+
+    # Write <prefix>.json and <prefix>.trace.json; returns the two paths
+    def write(self, prefix=None):
+        prefix = prefix or self.prefix
+        directory = os.path.dirname(prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        paths = (f'{prefix}.json', f'{prefix}.trace.json')
+        with open(paths[0], 'w') as f:
+            json.dump({'pid': self.pid, 'memory': self.memory, 'spans': self.summary()}, f, indent=2)
+            f.write('\n')
+        with open(paths[1], 'w') as f:
+            json.dump(self.chrome_trace(), f)
+        return paths
+
+    # In a forked child: start from an empty record under a prefix of its
+    # own
+    def _fork(self):
+        self.pid = os.getpid()
+        self.events = []
+        self._local = threading.local()
+        if self.prefix:
+            self.prefix = f'{self.prefix}-{self.pid}'
+
+class _Span:
+    def __init__(self, profiler, name, category, args):
+        self.profiler = profiler
+        self.name = name
+        self.category = category
+        self.args = dict(args)
+
+    def __enter__(self):
+        stack = self.profiler._stack()
+        if self.profiler.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]._peak = max(stack[-1]._peak, peak)
+            tracemalloc.reset_peak()
+            self._base = current
+            self._peak = current
+        stack.append(self)
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter_ns()
+        stack = self.profiler._stack()
+        stack.pop()
+        if self.profiler.memory:
+            peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+            self.args['peak_bytes'] = peak - self._base
+            if stack:
+                stack[-1]._peak = max(stack[-1]._peak, peak)
+        self.profiler.events.append({
+            'name': self.name, 'cat': self.category, 'tid': threading.get_ident(),
+            'ts': (self._start - self.profiler._origin) / 1e3, 'dur': (end - self._start) / 1e3, 'args': self.args,
+        })
+        return False
+
+def enabled():
+    return _profiler is not None
+
+# Start recording. With a prefix the files are written at exit.
+def enable(prefix=None, memory=True):
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler(prefix, memory)
+        if prefix:
+            from multiprocessing import util
+            atexit.register(_write_at_exit)
+            util.register_after_fork(_profiler, lambda profiler: _write_at_worker_exit())
+    return _profiler
+
+# Stop recording and return the profiler with what it collected
+def disable():
+    global _profiler
+    profiler, _profiler = _profiler, None
+    if profiler is not None and profiler.memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return profiler
+
+def _write_at_exit():
+    if _profiler is not None and _profiler.prefix and _profiler.events:
+        _profiler.write()
+
+# Pool workers leave through os._exit, which skips atexit but still runs
+# multiprocessing's finalizers (registered once the worker has started,
+# since starting clears those inherited from the parent)
+def _write_at_worker_exit():
+    from multiprocessing import util
+    util.Finalize(None, _write_at_exit, exitpriority=0)
+
+def _after_fork():
+    if _profiler is not None:
+        _profiler._fork()
+
+os.register_at_fork(after_in_child=_after_fork)
+
+# Context manager timing a block under (category, name); args are extra
+# fields shown in the trace and can be added to through the returned span
+def span(name, category='ctamodel', **args):
+    if _profiler is None:
+        return _NULL_SPAN
+    return _profiler.span(name, category, args)
+
+SOLVER_COUNTERS = ('nfev', 'njev', 'nlu', 'steps', 'rejected_steps')
+
+# solve_ivp with per-call counters when profiling is on; otherwise exactly
+# scipy.integrate.solve_ivp
+def solve_ivp(fun, t_span, y0, method='RK45', **options):
+    from scipy.integrate import solve_ivp as scipy_solve_ivp
+
+    if _profiler is None:
+        return scipy_solve_ivp(fun, t_span, y0, method=method, **options)
+
+    solver_class = _counting_solver(method)
+    with span(f'solve_ivp[{getattr(method, "__name__", method)}]', 'solver') as record:
+        solution = scipy_solve_ivp(fun, t_span, y0, method=solver_class, **options)
+        counts = solver_class.counts
+        record.args.update({
+            'nfev': int(solution.nfev), 'njev': int(solution.njev), 'nlu': int(solution.nlu),
+            'steps': counts['steps'], 'rejected_steps': counts['rejected_steps'], 'status': int(solution.status),
+        })
+    return solution
+
+# Fresh subclass of the solver class that counts its steps. Each
+# _step_impl call makes one accepted step (or fails); the right-hand-side
+# evaluations it spends beyond n_stages are rejected attempts.
+def _counting_solver(method):
+    from scipy.integrate._ivp.ivp import METHODS
+
+    base = METHODS[method] if isinstance(method, str) else method
+    counts = {'steps': 0, 'rejected_steps': 0 if getattr(base, 'n_stages', None) else None}
+
+    def _step_impl(self):
+        nfev = self.nfev
+        success, message = base._step_impl(self)
+        if success:
+            counts['steps'] += 1
+            if counts['rejected_steps'] is not None:
+                counts['rejected_steps'] += max((self.nfev - nfev) // self.n_stages - 1, 0)
+        return success, message
+
+    return type(f'Counting{base.__name__}', (base,), {'_step_impl': _step_impl, 'counts': counts})
+
+# Switch on from the environment at import. The first process records its
+# pid, so spawned workers that inherit the variable write separate files.
+if os.environ.get(ENV_VAR):
+    parent = os.environ.setdefault('_CTAMODEL_PROFILE_PARENT', str(os.getpid()))
+    prefix = os.environ[ENV_VAR]
+    if parent != str(os.getpid()):
+        prefix = f'{prefix}-{os.getpid()}'
+        _write_at_worker_exit()
+    enable(prefix, memory=os.environ.get(MEMORY_ENV_VAR, '1') != '0')
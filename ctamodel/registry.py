@@ -0,0 +1,60 @@
+import json
+import os
+
+# Site / pathway / scenario registry for the ED engine, read from a JSON
+# config such as sites.json:
+#
+#   {
+#     "sites": {
+#       "Norway": {"U_value": 0.18, "climate": {"SSP2-4.5": "trondheim_temperature_SSP2-45.csv"}},
+#       ...
+#     },
+#     "scenarios": {"Good": {"T_base": 2, "RH": 0.30}, ...}
+#   }
+#
+# Each site carries its own U-value and one climate file per SSP pathway;
+# extra keys (city, country, ...) are kept as they are. A scenario pairs a
+# cooling setpoint T_base (°C) with an indoor relative humidity RH (0-1).
+# Adding a site or a pathway is one more entry in the config.
+
+SITE_KEYS = ('U_value', 'climate')
+SCENARIO_KEYS = ('T_base', 'RH')
+
+# Load and check a registry. Climate paths are made absolute relative to
+# the config file. Returns {'sites': {...}, 'pathways': [...],
+# 'scenarios': {...}}, with pathways in order of first appearance.
+def load_registry(path):
+    with open(path) as f:
+        config = json.load(f)
+    return make_registry(config['sites'], config['scenarios'], base_dir=os.path.dirname(os.path.abspath(path)))
+
+# Same registry built from in-memory dicts
+def make_registry(sites, scenarios, base_dir='.'):
+    registry_sites = {}
+    pathways = []
+    for name, site in sites.items():
+        missing = [key for key in SITE_KEYS if key not in site]
+        if missing:
+            raise ValueError(f"site {name!r} is missing {', '.join(missing)}")
+        climate = {pathway: os.path.join(base_dir, file) for pathway, file in site['climate'].items()}
+        registry_sites[name] = dict(site, climate=climate)
+        pathways.extend(pathway for pathway in climate if pathway not in pathways)
+
+    for name, scenario in scenarios.items():
+        missing = [key for key in SCENARIO_KEYS if key not in scenario]
+        if missing:
+            raise ValueError(f"scenario {name!r} is missing {', '.join(missing)}")
+
+    return {'sites': registry_sites, 'pathways': pathways, 'scenarios': dict(scenarios)}
+
+# Site names, scenario names and U-value per site, in config order. These
+# also read job specs of the batch runner, whose "sites" block has the same
+# shape as a registry's.
+def site_names(registry):
+    return list(registry['sites'])
+
+def scenario_names(registry):
+    return list(registry['scenarios'])
+
+def U_values(registry):
+    return {name: site['U_value'] for name, site in registry['sites'].items()}
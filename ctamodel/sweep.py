@@ -0,0 +1,147 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+
+from . import degradation
+from .degradation import simulate_degradation
+from .profiling import span
+
+# Parameter sweep over exhibition/cold-storage calendars. The grid axes are
+# exhibition lengths (days), cold storage lengths (months), season
+# temperature profiles, cold storage temperatures (K) and end dates. Cells
+# are spread across a process pool, and every finished cell is appended to
+# a JSON-lines checkpoint so an interrupted sweep resumes where it stopped.
+
+def _cell_key(profile, cold_storage_temp, end_date, cold_storage_months, exhibition_days):
+    return (profile, float(cold_storage_temp), end_date.isoformat(), int(cold_storage_months), int(exhibition_days))
+
+# Worker entry point: one (profile, storage temperature, end date, months,
+# days) cell
+def _run_cell(key, season_temps, params):
+    profile, cold_storage_temp, end_date, cold_storage_months, exhibition_days = key
+    with span('sweep_cell', 'sweep', key=list(key)):
+        return simulate_degradation(
+            exhibition_days, cold_storage_months, datetime.fromisoformat(params['start_date']),
+            datetime.fromisoformat(end_date), season_temps, cold_storage_temp,
+            params['HOAc0'], params['ROAc0'], params['H2O0'], params['A'], params['Ea'], params['method'],
+        )
+
+# Read finished cells back from a checkpoint. The first record holds the
+# parameters shared by all cells; a checkpoint written with different ones
+# is refused rather than silently mixed in. A truncated last line (from a
+# crash mid-write) is ignored.
+def _load_checkpoint(path, params):
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if 'sweep' in record:
+                if record['sweep'] != params:
+                    raise ValueError(f"checkpoint {path} was written with different sweep parameters: {record['sweep']}")
+                continue
+            done[tuple(record['key'])] = record
+    return done
+
+def _open_checkpoint(path, params):
+    exists = os.path.exists(path) and os.path.getsize(path) > 0
+    needs_newline = False
+    if exists:
+        with open(path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b'\n'
+
+    f = open(path, 'a')
+    if needs_newline:
+        # Terminate a line left half-written by an interrupted run
+        f.write('\n')
+    if not exists:
+        f.write(json.dumps({'sweep': params}) + '\n')
+    f.flush()
+    return f
+
+def _append_record(f, record):
+    f.write(json.dumps(record) + '\n')
+    f.flush()
+    os.fsync(f.fileno())
+
+# Run the sweep and return {(profile, cold_storage_temp, end_date): matrix},
+# each matrix laid out like the exhibition scripts: one row per cold storage
+# length and one column per exhibition length.
+#
+# season_profiles maps a profile name to a season_temps dict. With
+# checkpoint set to a file path, finished cells are persisted there and
+# skipped on the next run. workers=1 runs in-process; None uses one worker
+# per core.
+def run_sweep(exhibition_lengths, cold_storage_lengths, season_profiles, cold_storage_temps, end_dates,
+              start_date=datetime(2015, 1, 1), checkpoint=None, workers=None,
+              HOAc0=degradation.HOAc0, ROAc0=degradation.ROAc0, H2O0=degradation.H2O0,
+              A=degradation.A, Ea=degradation.Ea, method='analytic', verbose=True):
+    params = {
+        'start_date': start_date.isoformat(),
+        'HOAc0': HOAc0, 'ROAc0': ROAc0, 'H2O0': H2O0, 'A': A, 'Ea': Ea,
+        'method': method,
+    }
+    # Round-trip through JSON so the comparison with a stored header is exact
+    params = json.loads(json.dumps(params))
+
+    cells = [
+        (_cell_key(profile, cold_storage_temp, end_date, months, days), season_temps)
+        for profile, season_temps in season_profiles.items()
+        for cold_storage_temp in cold_storage_temps
+        for end_date in end_dates
+        for months in cold_storage_lengths
+        for days in exhibition_lengths
+    ]
+
+    results = {}
+    done = _load_checkpoint(checkpoint, params) if checkpoint else {}
+    for key, season_temps in cells:
+        record = done.get(key)
+        if record is not None and record['season_temps'] == season_temps:
+            results[key] = record['HOAc']
+    pending = [(key, season_temps) for key, season_temps in cells if key not in results]
+    if verbose and len(results):
+        print(f"Resuming sweep: {len(results)} of {len(cells)} cells already done")
+
+    f = _open_checkpoint(checkpoint, params) if checkpoint else None
+    try:
+        def finish(key, season_temps, HOAc):
+            results[key] = HOAc
+            if f is not None:
+                _append_record(f, {'key': list(key), 'season_temps': season_temps, 'HOAc': HOAc})
+            if verbose:
+                profile, cold_storage_temp, end_date, months, days = key
+                print(f"Finished {profile}, {cold_storage_temp} K until {end_date[:10]}: "
+                      f"{months} months cold storage and {days} days exhibition")
+
+        if workers == 1:
+            for key, season_temps in pending:
+                finish(key, season_temps, float(_run_cell(key, season_temps, params)))
+        elif pending:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(_run_cell, key, season_temps, params): (key, season_temps) for key, season_temps in pending}
+                for future in as_completed(futures):
+                    key, season_temps = futures[future]
+                    finish(key, season_temps, float(future.result()))
+    finally:
+        if f is not None:
+            f.close()
+
+    matrices = {}
+    for profile in season_profiles:
+        for cold_storage_temp in cold_storage_temps:
+            for end_date in end_dates:
+                matrix = np.zeros((len(cold_storage_lengths), len(exhibition_lengths)))
+                for i, months in enumerate(cold_storage_lengths):
+                    for j, days in enumerate(exhibition_lengths):
+                        matrix[i, j] = results[_cell_key(profile, cold_storage_temp, end_date, months, days)]
+                matrices[(profile, cold_storage_temp, end_date)] = matrix
+    return matrices
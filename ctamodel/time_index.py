@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+from .degradation import season_of_month
+
+# Calendar index over a daily climate series. Rows are grouped into
+# contiguous (year, month) segments once, storing each segment's first row
+# and length; the Rome file has a few out-of-order rows, which are handled by
+# a stable sort order kept alongside (and skipped for series already in
+# date order, like the Trondheim file).
+#
+# A reduction is then one np.add.reduceat over the rows of each column,
+# giving per-month sums, and every coarser aggregate comes from those sums:
+#
+#   index = TimeIndex.from_climate(climate)
+#   totals = index.reduce({'CDD': CDD, 'SH': SH})
+#   totals.annual()                       # sums per year
+#   totals.annual('mean')                 # means per year
+#   totals.seasonal('mean')               # per (year, season)
+#   totals.total(years=range(2015, 2021), seasons=['summer'])
+#
+# so no filtered copies of the frame are made, whatever mix of years,
+# months and seasons is asked for.
+
+SEASONS = ('winter', 'spring/autumn', 'summer')
+SEASON_OF_MONTH = np.array([SEASONS.index(season_of_month(month)) for month in range(1, 13)])
+
+class TimeIndex:
+    def __init__(self, year, month):
+        key = np.asarray(year, dtype=np.int64) * 12 + np.asarray(month, dtype=np.int64) - 1
+        # Row order that makes the months contiguous; None when they already are
+        self.order = None if np.all(key[1:] >= key[:-1]) else np.argsort(key, kind='stable')
+        if self.order is not None:
+            key = key[self.order]
+        self.n_rows = len(key)
+        if not len(key):
+            raise ValueError("a time index needs at least one row")
+        self.month_starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+        self.month_counts = np.diff(np.append(self.month_starts, len(key)))
+        month_keys = key[self.month_starts]
+        # Year and calendar month (1-12) of each month segment
+        self.segment_years = month_keys // 12
+        self.segment_months = month_keys % 12 + 1
+        # Years present and the first month segment of each
+        self.years, self.year_starts = np.unique(self.segment_years, return_index=True)
+
+    @classmethod
+    def from_climate(cls, climate):
+        return cls(climate['year'], climate['month'])
+
+    # Per-month sums of each column of a {name: daily values} mapping (a
+    # climate dict or a DataFrame), accumulated in float64
+    def reduce(self, columns):
+        names = list(columns)
+        sums = np.empty((len(self.month_starts), len(names)))
+        for j, name in enumerate(names):
+            values = np.asarray(columns[name])
+            if len(values) != self.n_rows:
+                raise ValueError(f"column {name!r} has {len(values)} rows, the index {self.n_rows}")
+            if self.order is not None:
+                values = values[self.order]
+            sums[:, j] = np.add.reduceat(values, self.month_starts, dtype=np.float64)
+        return SegmentTotals(self, names, sums)
+
+# Per-month sums of some columns over a TimeIndex, and the aggregates built
+# from them. how='sum' or 'mean' (mean over the days present).
+class SegmentTotals:
+    def __init__(self, index, names, sums):
+        self.index = index
+        self.names = names
+        self.sums = sums
+
+    def _finish(self, sums, counts, how):
+        if how == 'sum':
+            return sums
+        if how == 'mean':
+            with np.errstate(invalid='ignore'):
+                return sums / counts[:, np.newaxis]
+        raise ValueError(f"how must be 'sum' or 'mean', not {how!r}")
+
+    # One row per (year, month) present
+    def monthly(self, how='sum'):
+        index = pd.MultiIndex.from_arrays([self.index.segment_years, self.index.segment_months], names=['year', 'month'])
+        return pd.DataFrame(self._finish(self.sums, self.index.month_counts, how), index=index, columns=self.names)
+
+    # One row per year present
+    def annual(self, how='sum'):
+        sums = np.add.reduceat(self.sums, self.index.year_starts, axis=0)
+        counts = np.add.reduceat(self.index.month_counts, self.index.year_starts)
+        return pd.DataFrame(self._finish(sums, counts, how), index=pd.Index(self.index.years, name='year'),
+                            columns=self.names)
+
+    # One row per (year, season), seasons as in season_of_month and within
+    # the calendar year (December counts towards its own year's winter)
+    def seasonal(self, how='sum'):
+        year_position = np.searchsorted(self.index.years, self.index.segment_years)
+        group = year_position * len(SEASONS) + SEASON_OF_MONTH[self.index.segment_months - 1]
+        sums = np.zeros((len(self.index.years) * len(SEASONS), len(self.names)))
+        counts = np.zeros(len(sums), dtype=np.int64)
+        np.add.at(sums, group, self.sums)
+        np.add.at(counts, group, self.index.month_counts)
+        index = pd.MultiIndex.from_product([self.index.years, SEASONS], names=['year', 'season'])
+        present = counts > 0
+        return pd.DataFrame(self._finish(sums, counts, how)[present], index=index[present], columns=self.names)
+
+    # Sum or mean of each column over the days in the given years, calendar
+    # months and seasons (None means all), as a Series
+    def total(self, years=None, months=None, seasons=None, how='sum'):
+        selected = np.ones(len(self.sums), dtype=bool)
+        if years is not None:
+            selected &= np.isin(self.index.segment_years, list(years))
+        if months is not None:
+            selected &= np.isin(self.index.segment_months, list(months))
+        if seasons is not None:
+            unknown = set(seasons) - set(SEASONS)
+            if unknown:
+                raise ValueError(f"unknown seasons {sorted(unknown)}; expected {SEASONS}")
+            selected &= np.isin(SEASON_OF_MONTH[self.index.segment_months - 1], [SEASONS.index(s) for s in seasons])
+        sums = self.sums[selected].sum(axis=0, keepdims=True)
+        counts = np.array([self.index.month_counts[selected].sum()])
+        return pd.Series(self._finish(sums, counts, how)[0], index=self.names)
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from . import degradation
+from .degradation import hoac_after_exposure
+
+# Monte Carlo propagation of parameter uncertainty through the storage
+# scenarios. Every draw of (A, Ea, HOAc0, ROAc0, H2O0) only changes the rate
+# constant and the bounds of the analytic propagator, so a whole batch of
+# draws x temperatures x times is one broadcast exposure array and one
+# vectorized inversion (see degradation.hoac_after_exposure) - no solver call
+# per draw.
+#
+# Distributions are given per parameter as a plain number (held fixed) or a
+# dict such as
+#   {"dist": "normal", "mean": 70734, "sd": 2000}
+#   {"dist": "lognormal", "median": 0.00103, "sigma": 0.5}
+#   {"dist": "uniform", "low": 40, "high": 65}
+#   {"dist": "triangular", "low": 40, "mode": 52, "high": 65}
+# Parameters left out keep the point values from degradation.py.
+
+PARAMETERS = ('A', 'Ea', 'HOAc0', 'ROAc0', 'H2O0')
+
+def _draw(spec, n, rng):
+    if not isinstance(spec, dict):
+        return np.full(n, float(spec))
+    dist = spec['dist']
+    if dist == 'normal':
+        return rng.normal(spec['mean'], spec['sd'], n)
+    if dist == 'lognormal':
+        return spec['median'] * np.exp(rng.normal(0.0, spec['sigma'], n))
+    if dist == 'uniform':
+        return rng.uniform(spec['low'], spec['high'], n)
+    if dist == 'triangular':
+        return rng.triangular(spec['low'], spec['mode'], spec['high'], n)
+    raise ValueError(f"unknown distribution {dist!r}, expected normal, lognormal, uniform or triangular")
+
+# Draw n parameter sets; returns {parameter: array of n values}
+def sample_parameters(distributions, n, seed=None):
+    unknown = set(distributions) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"no distribution can be given for {sorted(unknown)}, expected {PARAMETERS}")
+    rng = np.random.default_rng(seed)
+    samples = {name: _draw(distributions.get(name, getattr(degradation, name)), n, rng) for name in PARAMETERS}
+    if np.any(samples['HOAc0'] < 0) or np.any(samples['HOAc0'] > np.minimum(samples['ROAc0'], samples['H2O0'])):
+        raise ValueError("sampled HOAc0 must lie in [0, min(ROAc0, H2O0)]; narrow the distributions")
+    return samples
+
+# HOAc for every draw at every storage temperature (K) and time (seconds
+# from the start). Returns an array of shape (draws x temperatures x times).
+# Draws are processed in chunks of chunk_size to bound the size of the
+# temporaries of the inversion.
+def propagate_samples(samples, temperatures, t_eval, chunk_size=2_000):
+    T = np.asarray(temperatures, dtype=float)
+    t = np.asarray(t_eval, dtype=float) - t_eval[0]
+    n = len(samples['A'])
+    HOAc = np.empty((n, len(T), len(t)))
+    for start in range(0, n, chunk_size):
+        draws = slice(start, start + chunk_size)
+        A, Ea, HOAc0, ROAc0, H2O0 = (samples[name][draws, np.newaxis, np.newaxis] for name in PARAMETERS)
+        k = A * np.exp(-Ea / (degradation.R * T[np.newaxis, :, np.newaxis]))
+        HOAc[draws] = hoac_after_exposure(HOAc0, k * t, ROAc0, H2O0)
+    return HOAc
+
+# Per-year quantile bands of the constant-temperature storage curves.
+# temperatures maps a label to a storage temperature in K, e.g.
+# {"2°C": 275.15, "7°C": 280.15, "15°C": 288.15}. Returns a DataFrame
+# indexed by Year (0..years) with (case, quantile) columns.
+def storage_uncertainty_bands(distributions, temperatures, years=50, n_draws=100_000,
+                              quantiles=(0.05, 0.25, 0.5, 0.75, 0.95), seed=None, chunk_size=2_000):
+    samples = sample_parameters(distributions, n_draws, seed)
+    year_grid = np.arange(0, years + 1)
+    t_eval = year_grid * 365.25 * 24 * 60 * 60
+    HOAc = propagate_samples(samples, list(temperatures.values()), t_eval, chunk_size)
+
+    bands = np.quantile(HOAc, quantiles, axis=0)  # (quantile x case x year)
+    columns = pd.MultiIndex.from_product([list(temperatures), list(quantiles)], names=['case', 'quantile'])
+    return pd.DataFrame(
+        bands.transpose(2, 1, 0).reshape(len(year_grid), -1),
+        index=pd.Index(year_grid, name='Year'), columns=columns,
+    )
@@ -0,0 +1,49 @@
+import numpy as np
+from datetime import datetime
+from ctamodel.climate_data import load_climate
+from ctamodel.degradation import rate_constant
+from ctamodel.lifetime import cycle_time_to_threshold, daily_climate_time_to_threshold, time_to_threshold
+
+# Constants
+ROAc0 = 13403.6  # Initial acetyl concentration (mol/m³)
+H2O0 = 2137.2  # Initial water concentration (mol/m³)
+HOAc0 = 52  # Initial acetic acid concentration (mol/m³)
+SECONDS_PER_YEAR = 365.25 * 24 * 3600
+
+# HOAc thresholds (mol/m³)
+thresholds = [100, 200, 400]
+
+# Constant storage temperatures (°C)
+storage_temperatures = {"2°C": 2, "7°C": 7, "15°C": 15}
+print("Years to each threshold at constant temperature:")
+for label, T in storage_temperatures.items():
+    years = time_to_threshold(rate_constant(T + 273.15), thresholds, HOAc0, ROAc0, H2O0) / SECONDS_PER_YEAR
+    print(f"{label}\t" + "\t".join(f"{N} mol/m³: {y:.1f}" for N, y in zip(thresholds, years)))
+
+# Exhibition + cold storage calendars, ranked by years to the first threshold
+start_date = datetime(2015, 1, 1)
+end_date = datetime(2100, 1, 1)
+season_temps = {"winter": 273.15 + 18, "summer": 273.15 + 25, "spring/autumn": 273.15 + 18}
+cold_storage_temp = 275.15  # K
+exhibition_lengths = np.arange(7, 57, 7)  # In days
+cold_storage_lengths = np.arange(3, 61, 3)  # In months
+
+years = cycle_time_to_threshold(exhibition_lengths, cold_storage_lengths, thresholds, start_date, end_date,
+                                season_temps, cold_storage_temp, HOAc0, ROAc0, H2O0) / SECONDS_PER_YEAR
+order = np.argsort(years[:, :, 0], axis=None, kind='stable')
+print(f"\nExhibition calendars by years to {thresholds[0]} mol/m³ (shortest and longest five):")
+for flat in np.concatenate([order[:5], order[-5:]]):
+    i, j = np.unravel_index(flat, years.shape[:2])
+    print(f"{exhibition_lengths[j]} days every {cold_storage_lengths[i]} months\t"
+          + "\t".join(f"{y:.1f}" for y in years[i, j]))
+
+# Daily SSP2-4.5 climate, storage scenarios by cooling setpoint (°C)
+T_base_values = {"Good": 2, "Average": 7, "Bad": 15}
+climates = {
+    "Norway": load_climate('trondheim_temperature_SSP2-45.csv'),
+    "Italy": load_climate('rome_temperature_SSP2-45.csv'),
+}
+crossings = daily_climate_time_to_threshold(climates, T_base_values, thresholds, HOAc0, ROAc0, H2O0)
+for site, table in crossings.items():
+    print(f"\nDate each threshold is reached, {site}:")
+    print(table.apply(lambda column: column.dt.date).to_string())
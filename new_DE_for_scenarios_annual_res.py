@@ -1,6 +1,16 @@
 import numpy as np
-from scipy.integrate import solve_ivp
 import pandas as pd
+from ctamodel.degradation import hoac_trajectory
+from ctamodel.uncertainty import storage_uncertainty_bands
+
+# Integration backend: 'analytic' for the exact propagator, or a solve_ivp
+# method such as 'RK45' for the numerical solver
+METHOD = 'analytic'
+
+# Also propagate the parameter uncertainty below through the three storage
+# scenarios with N_DRAWS Monte Carlo draws and save per-year quantile bands
+UNCERTAINTY = False
+N_DRAWS = 100_000
 
 # Constants for the model
 R = 8.314  # Ideal gas constant (J/(mol·K))
@@ -17,13 +27,6 @@ years = np.arange(0, 51, 1)  # From year 0 to 50
 time_span = (0, 50 * 365.25 * 24 * 60 * 60)  # 50 years in seconds
 time_eval = years * 365.25 * 24 * 60 * 60  # Convert years to seconds
 
-# Define the ODE function
-def acetic_acid_concentration(t, HOAc, k):
-    ROAc = ROAc0 - HOAc
-    H2O = H2O0 - HOAc
-    dHOAc_dt = k * ROAc * H2O * HOAc
-    return dHOAc_dt
-
 # Define scenarios
 cases = {
     "2°C": {"HOAc0": HOAc0, "T": 275.15},  # 2°C
@@ -40,13 +43,7 @@ for case, params in cases.items():
     k = A * np.exp(-Ea / (R * T))
     
     # Solve the ODE
-    solution = solve_ivp(
-        acetic_acid_concentration, time_span, [HOAc0],
-        args=(k,), method='RK45', t_eval=time_eval
-    )
-    
-    # Store results
-    data[case] = solution.y[0]
+    data[case] = hoac_trajectory(k, time_eval, HOAc0, ROAc0, H2O0, method=METHOD)
 
 # Convert results to DataFrame
 results_df = pd.DataFrame(data)
@@ -56,3 +53,19 @@ results_df.to_csv("acetic_acid_concentration_over_50_years.csv", index=False)
 
 # Print results
 print(results_df)
+
+if UNCERTAINTY:
+    # A and Ea are poorly constrained (table1_Ahmad.py fits A=1.03e5, Ea=87e3
+    # to the 70°C data), so both get wide distributions around the point values
+    distributions = {
+        "A": {"dist": "lognormal", "median": A, "sigma": 0.3},
+        "Ea": {"dist": "normal", "mean": Ea, "sd": 1000},
+        "HOAc0": {"dist": "uniform", "low": 40, "high": 65},
+        "ROAc0": {"dist": "normal", "mean": ROAc0, "sd": 0.02 * ROAc0},
+        "H2O0": {"dist": "normal", "mean": H2O0, "sd": 0.05 * H2O0},
+    }
+    bands = storage_uncertainty_bands(
+        distributions, {case: params["T"] for case, params in cases.items()}, years=50, n_draws=N_DRAWS, seed=0
+    )
+    bands.to_csv("acetic_acid_concentration_uncertainty_bands.csv")
+    print(bands.loc[[0, 10, 25, 50]])
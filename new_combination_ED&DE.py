@@ -1,35 +1,11 @@
 import matplotlib.pyplot as plt
-import pandas as pd
+from ctamodel.pipeline import DEFAULT_PARAMS, PIPELINE
 
-# Load degradation data
-degradation_data = {
-    "Year": list(range(51)),
-    "2°C": [52.000000, 53.782718, 55.624668, 57.527688, 59.493618, 61.524130, 63.621243, 65.787078, 68.023796, 70.333604, 
-             72.718749, 75.181523, 77.724259, 80.349332, 83.059163, 85.856212, 88.742983, 91.722023, 94.795922, 97.967312, 
-             101.238867, 104.613305, 108.093386, 111.681914, 115.381732, 119.195729, 123.126837, 127.178029, 131.352320, 135.652769, 
-             140.082478, 144.644592, 149.342296, 154.178816, 159.157349, 164.281240, 169.553873, 174.978599, 180.558744, 186.297602, 
-             192.198440, 198.264492, 204.498968, 210.905044, 217.485871, 224.244567, 231.184223, 238.307901, 245.618632, 253.119421, 
-             260.813240],
-    "7°C": [52.000000, 55.133424, 58.449546, 61.958264, 65.669734, 69.593788, 73.742103, 78.126965, 82.761009, 87.657221, 
-             92.828936, 98.289842, 104.053972, 110.135714, 116.549802, 123.311322, 130.435710, 137.938752, 145.836583, 154.145689, 
-             162.882905, 172.064880, 181.695977, 191.794245, 202.384163, 213.488570, 225.128668, 237.324019, 250.092545, 263.450530, 
-             277.412619, 291.991816, 307.199489, 323.045365, 339.537532, 356.682439, 374.484897, 392.948075, 412.073506, 431.861083, 
-             452.309059, 473.414048, 495.171027, 517.573332, 540.612545, 564.276355, 588.548142, 613.408444, 638.835010, 664.802800, 
-             691.283986],
-    "15°C": [52.000000, 59.563592, 68.185788, 78.001972, 89.158732, 101.811143, 116.147752, 132.364547, 150.661019, 171.240158, 
-              194.308458, 220.075911, 248.740719, 280.446481, 315.442497, 353.928544, 396.027702, 441.786357, 491.174202, 544.084236, 
-              600.332761, 659.659388, 721.736861, 786.318535, 852.865854, 920.755891, 989.396136, 1058.224499, 1126.709306, 1194.349306, 
-              1260.673662, 1325.241958, 1387.644196, 1447.500798, 1504.462601, 1558.270323, 1608.895000, 1656.308474, 1700.506762, 1741.513996, 
-              1779.382430, 1814.192440, 1846.052519, 1875.099281, 1901.497462, 1925.439915, 1947.147614, 1966.847467, 1984.648598, 2000.695634, 
-              2015.139847]
-}
-
-# Load cumulative ED data
-ed_data = pd.read_csv("cumulative_energy_demand_50_years.csv")
-
-# Normalize cumulative ED data to start at 0
-for col in ["Good_Norway", "Average_Norway", "Bad_Norway"]:
-    ed_data[col] -= ed_data[col].iloc[0]
+# Cumulative ED for Norway (starting at 0) and the degradation curve of the
+# matching storage temperature, by years since 2015. Stages are recomputed
+# only when their parameters or code change; otherwise they come from the
+# on-disk cache.
+combined = PIPELINE.run(["ed_vs_degradation"], DEFAULT_PARAMS, verbose=True)["ed_vs_degradation"]
 
 # Define colors and linestyles
 colors = {"2°C": "green", "7°C": "black", "15°C": "red"}
@@ -39,11 +15,11 @@ plt.figure(figsize=(10, 6))
 
 # Plot degradation data
 for temp in ["2°C", "7°C", "15°C"]:
-    plt.plot(degradation_data["Year"], degradation_data[temp], linestyle=linestyles["degradation"], color=colors[temp], label=f"Degradation ({temp})")
+    plt.plot(combined["Year"], combined[f"HOAc_{temp}"], linestyle=linestyles["degradation"], color=colors[temp], label=f"Degradation ({temp})")
 
 # Plot ED data for Norway only in logarithmic scale
-for temp, ed_column in zip(["2°C", "7°C", "15°C"], ["Good_Norway", "Average_Norway", "Bad_Norway"]):
-    plt.plot(ed_data[ed_column], ed_data["Year"], linestyle=linestyles["ED"], color=colors[temp], label=f"Cumulative ED ({temp}, Norway)")
+for temp in ["2°C", "7°C", "15°C"]:
+    plt.plot(combined[f"ED_{temp}"], combined["Year"], linestyle=linestyles["ED"], color=colors[temp], label=f"Cumulative ED ({temp}, Norway)")
 
 plt.xlabel("Cumulative ED (kWh)")
 plt.ylabel("Degradation Concentration")
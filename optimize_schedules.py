@@ -0,0 +1,42 @@
+import numpy as np
+from ctamodel.climate_data import load_climate
+from ctamodel.emissions import emission_factor_matrix, load_emission_factors
+from ctamodel.optimize import optimize_schedules
+
+# Constants
+A = 0.00103  # Pre-exponential factor (mol^-2 m^6 s^-1)
+Ea = 70734  # Activation energy (J/mol)
+ROAc0 = 13403.6  # Initial acetyl concentration (mol/m³)
+H2O0 = 2137.2  # Initial water concentration (mol/m³)
+HOAc0 = 52  # Initial acetic acid concentration (mol/m³)
+
+# Sites: daily SSP2-4.5 climate and U-value (W/(m²K))
+climates = {
+    "Norway": load_climate('trondheim_temperature_SSP2-45.csv'),
+    "Italy": load_climate('rome_temperature_SSP2-45.csv'),
+}
+U_values = {"Norway": 0.18, "Italy": 0.32}
+
+# Search space: vault setpoints and exhibition/storage calendars
+T_bases = np.arange(2, 15.5, 0.5)  # Cooling setpoint (°C)
+RHs = [0.30, 0.40, 0.50, 0.60, 0.70]
+exhibition_lengths = np.arange(7, 92, 7)  # In days
+cold_storage_lengths = np.arange(1, 25)  # In months
+season_temps = {"winter": 273.15 + 18, "summer": 273.15 + 25, "spring/autumn": 273.15 + 18}
+
+# Keep HOAc below the limit until the end of the horizon
+start_year, end_year = 2015, 2044
+max_HOAc = 200  # mol/m³
+
+# Grid emission factors of each site's country for every year of the
+# horizon (kg CO₂ per kWh)
+factors = load_emission_factors('data/emission_factors.csv')
+emission_factors = dict(zip(climates, emission_factor_matrix(factors, list(climates), range(start_year, end_year + 1))))
+
+if __name__ == "__main__":
+    front = optimize_schedules(
+        climates, U_values, emission_factors, T_bases, RHs, exhibition_lengths, cold_storage_lengths,
+        start_year, end_year, max_HOAc, season_temps, HOAc0, ROAc0, H2O0, A, Ea,
+    )
+    print(f"Pareto front: ED and CO₂ against exhibition time, HOAc <= {max_HOAc} mol/m³ at the end of {end_year}")
+    print(front.to_string(index=False, float_format=lambda value: f"{value:.3f}"))
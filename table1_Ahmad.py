@@ -1,9 +1,9 @@
 import numpy as np
 from scipy.integrate import odeint
 import matplotlib.pyplot as plt
+from ctamodel.degradation import acetic_acid_concentration, rate_constant
 
 # Constants
-R = 8.314  # J/(mol*K), gas constant
 A = 1.03e5  # Adjusted pre-exponential factor
 Ea = 87e3  # Adjusted activation energy in J/mol
 
@@ -18,16 +18,11 @@ high_temp = 273.15 + 70  # 70°C in Kelvin
 # Time points for 114 days
 t_high_temp = np.linspace(0, 114, 1000)  # Higher resolution
 
-# Differential equation for degradation
-def damage_model(HOAc, t, ROAc_0, H2O_0):
-    k = A * np.exp(-Ea / (R * high_temp))
-    ROAc = ROAc_0 - HOAc
-    H2O = H2O_0 - HOAc
-    dHOAc_dt = k * ROAc * H2O * HOAc
-    return dHOAc_dt
+# Rate constant at 70°C (per day with the adjusted A)
+k_high_temp = rate_constant(high_temp, A, Ea)
 
 # Solve the ODE
-HOAc_t = odeint(damage_model, HOAc_0, t_high_temp, args=(ROAc_0, H2O_0))
+HOAc_t = odeint(acetic_acid_concentration, HOAc_0, t_high_temp, args=(k_high_temp, ROAc_0, H2O_0), tfirst=True)
 
 # Convert to free acidity (mL of 0.1 M NaOH/g)
 free_acidity = HOAc_t.flatten() / 130
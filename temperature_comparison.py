@@ -1,37 +1,19 @@
-import pandas as pd
 import matplotlib.pyplot as plt
+from ctamodel.climate_data import load_climate_frame
+from ctamodel.time_index import TimeIndex
 
-# Load the CSV files
-df_trondheim = pd.read_csv('trondheim_temperature_SSP2-45.csv', delimiter=';')
-df_rome = pd.read_csv('rome_temperature_SSP2-45.csv', delimiter=';')
+# Load the CSV files (parsed once, then read from the binary cache)
+df_trondheim = load_climate_frame('trondheim_temperature_SSP2-45.csv')
+df_rome = load_climate_frame('rome_temperature_SSP2-45.csv')
 
-# Rename columns for easier reference
-df_trondheim.columns = ['datetime', 'year', 'month', 'day', 'Tmin[K]', 'Tmax[K]']
-df_rome.columns = ['datetime', 'year', 'month', 'day', 'Tmin[K]', 'Tmax[K]']
-
-# Convert Tmin and Tmax columns to numeric, coercing invalid entries to NaN
-df_trondheim['Tmin[K]'] = pd.to_numeric(df_trondheim['Tmin[K]'].str.replace(',', '.'), errors='coerce')
-df_trondheim['Tmax[K]'] = pd.to_numeric(df_trondheim['Tmax[K]'].str.replace(',', '.'), errors='coerce')
-df_rome['Tmin[K]'] = pd.to_numeric(df_rome['Tmin[K]'].str.replace(',', '.'), errors='coerce')
-df_rome['Tmax[K]'] = pd.to_numeric(df_rome['Tmax[K]'].str.replace(',', '.'), errors='coerce')
-
-# Drop rows with NaN values
-df_trondheim.dropna(subset=['Tmin[K]', 'Tmax[K]'], inplace=True)
-df_rome.dropna(subset=['Tmin[K]', 'Tmax[K]'], inplace=True)
-
-# Convert temperatures from Kelvin to Celsius
-df_trondheim['Tmin[C]'] = df_trondheim['Tmin[K]'] - 273.15
-df_trondheim['Tmax[C]'] = df_trondheim['Tmax[K]'] - 273.15
-df_rome['Tmin[C]'] = df_rome['Tmin[K]'] - 273.15
-df_rome['Tmax[C]'] = df_rome['Tmax[K]'] - 273.15
+# Monthly Tmin/Tmax sums of each file in one segment reduction; the monthly
+# and yearly averages below are both read off these
+totals_trondheim = TimeIndex.from_climate(df_trondheim).reduce(df_trondheim[['Tmin[C]', 'Tmax[C]']])
+totals_rome = TimeIndex.from_climate(df_rome).reduce(df_rome[['Tmin[C]', 'Tmax[C]']])
 
 # --- First Graph: Monthly averages for 2015-2020 ---
-df_trondheim_filtered_5_years = df_trondheim[(df_trondheim['year'] >= 2015) & (df_trondheim['year'] <= 2020)]
-df_rome_filtered_5_years = df_rome[(df_rome['year'] >= 2015) & (df_rome['year'] <= 2020)]
-
-# Group by year and month for monthly averages
-df_trondheim_avg_5_years = df_trondheim_filtered_5_years.groupby(['year', 'month'])[['Tmin[C]', 'Tmax[C]']].mean().reset_index()
-df_rome_avg_5_years = df_rome_filtered_5_years.groupby(['year', 'month'])[['Tmin[C]', 'Tmax[C]']].mean().reset_index()
+df_trondheim_avg_5_years = totals_trondheim.monthly('mean').loc[2015:2020].reset_index()
+df_rome_avg_5_years = totals_rome.monthly('mean').loc[2015:2020].reset_index()
 
 # Create a combined "year-month" label for the x-axis
 df_trondheim_avg_5_years['year-month'] = df_trondheim_avg_5_years['year'].astype(str) + '-' + df_trondheim_avg_5_years['month'].astype(str).str.zfill(2)
@@ -59,12 +41,8 @@ plt.show()
 '''
 
 # --- Second Graph: Yearly averages for 2015-2065 ---
-df_trondheim_filtered_50_years = df_trondheim[df_trondheim['year'] <= 2065]
-df_rome_filtered_50_years = df_rome[df_rome['year'] <= 2065]
-
-# Group by year for yearly averages
-df_trondheim_avg_50_years = df_trondheim_filtered_50_years.groupby('year')[['Tmin[C]', 'Tmax[C]']].mean().reset_index()
-df_rome_avg_50_years = df_rome_filtered_50_years.groupby('year')[['Tmin[C]', 'Tmax[C]']].mean().reset_index()
+df_trondheim_avg_50_years = totals_trondheim.annual('mean').loc[:2065].reset_index()
+df_rome_avg_50_years = totals_rome.annual('mean').loc[:2065].reset_index()
 
 # Plotting the yearly averages for Tmin and Tmax for both cities (2015-2065)
 plt.figure(figsize=(10, 6))
@@ -0,0 +1,35 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from ctamodel.collection import CollectionStore, vault
+
+def make_store():
+    store = CollectionStore({'home': vault(288.15), 'loan': vault(298.15), 'other': vault(280.15)},
+                            datetime(2020, 1, 1), datetime(2024, 1, 1))
+    return store, store.add_objects([52, 52, 52], 'home')
+
+# Overlapping and nested loans give the exposure of the single stay they cover
+def test_overlapping_and_nested_loans_match_single_stay():
+    store, objects = make_store()
+    store.add_loan(objects[0], 'loan', datetime(2021, 1, 1), datetime(2022, 1, 1))
+    store.add_loan(objects[0], 'loan', datetime(2021, 6, 1), datetime(2022, 6, 1))
+    store.add_loan(objects[1], 'loan', datetime(2021, 1, 1), datetime(2022, 6, 1))
+    store.add_loan(objects[2], 'loan', datetime(2021, 1, 1), datetime(2022, 6, 1))
+    store.add_loan(objects[2], 'loan', datetime(2021, 3, 1), datetime(2021, 4, 1))
+
+    exposure = store.exposure_at(datetime(2023, 1, 1))
+    np.testing.assert_allclose(exposure, exposure[1], rtol=1e-12)
+    assert len(store.loan_object) == 3
+
+def test_conflicting_loan_is_rejected():
+    store, objects = make_store()
+    store.add_loan(objects[1], 'loan', datetime(2021, 1, 1), datetime(2022, 6, 1))
+    with pytest.raises(ValueError):
+        store.add_loan(objects[1], 'other', datetime(2022, 1, 1), datetime(2022, 2, 1))
+
+def test_empty_loan_is_rejected():
+    store, objects = make_store()
+    with pytest.raises(ValueError):
+        store.add_loan(objects[1], 'loan', datetime(2023, 1, 1), datetime(2023, 1, 1))